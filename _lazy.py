@@ -0,0 +1,31 @@
+"""
+Lazy loading of submodules: a package lists its submodules in __all__ and imports each one on first attribute access,
+so importing the package costs nothing until a submodule is used.
+"""
+
+
+import importlib
+import sys
+
+
+def attach(package, submodules):
+    """
+    Module-level __getattr__ and __dir__ of a package importing its submodules on first access.
+
+    :param str package: name of the package (its __name__)
+    :param list submodules: names of the submodules
+    :return: __getattr__, __dir__
+    :rtype: function, function
+    """
+    submodules = frozenset(submodules)
+
+    def __getattr__(name):
+        if name in submodules:
+            # import_module also sets the submodule as an attribute of the package, so this runs once per submodule
+            return importlib.import_module(package + '.' + name)
+        raise AttributeError('module %r has no attribute %r' % (package, name))
+
+    def __dir__():
+        return sorted(submodules.union(vars(sys.modules[package])))
+
+    return __getattr__, __dir__
@@ -0,0 +1,5 @@
+from nzsci._lazy import attach
+
+__all__ = ['bench_discretizer', 'bench_filter', 'bench_ga', 'bench_import', 'bench_number', 'bench_plotting',
+           'bench_regression', 'bench_sweep', 'bench_txtfile', 'run']
+__getattr__, __dir__ = attach(__name__, __all__)
@@ -0,0 +1,72 @@
+"""
+Benchmark of the state discretizer against pandas.cut called for every lookup.
+"""
+
+
+import time
+import numpy as np
+from nzsci.math.discretizer import Discretizer, uniform_edges
+
+
+def _cut_reference(values, n_bins):
+    # what pandas.cut(values, n_bins) computes, bins rebuilt at every call, for when pandas is not installed
+    values = np.asarray(values, dtype=float)
+    edges = uniform_edges(values.min(), values.max(), n_bins)
+    return np.searchsorted(edges, values, side='left') - 1
+
+
+def bench_discretizer(n_dimensions=3, n_bins=20, n_lookups=20000, n_states=1000000):
+    """
+    Time per lookup of one state with pandas.cut (one call per dimension, as in multi_param.py), with the reference
+    bins rebuilt at every call, with Discretizer.index, and per state of Discretizer.indices on a batch
+
+    :param int n_dimensions: number of dimensions of the state
+    :param int n_bins: number of bins per dimension
+    :param int n_lookups: number of single-state lookups timed
+    :param int n_states: number of states of the batch
+    :return: times (us), None for pandas.cut if pandas is not installed, and whether all methods agree
+    :rtype: dict
+    """
+    rng = np.random.default_rng(0)
+    low = np.zeros(n_dimensions)
+    high = np.ones(n_dimensions)
+    states = rng.uniform(size=(n_lookups, n_dimensions))
+    discretizer = Discretizer.uniform(low, high, n_bins)
+    strides = n_bins ** np.arange(n_dimensions - 1, -1, -1)
+    results = {}
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        start = time.perf_counter()
+        expected = [sum(int(pd.cut([low[i], value, high[i]], n_bins, labels=False)[1]) * strides[i]
+                        for i, value in enumerate(state)) for state in states.tolist()]
+        results['pandas_cut_us'] = (time.perf_counter() - start) / n_lookups * 1e6
+    else:
+        results['pandas_cut_us'] = None
+
+    start = time.perf_counter()
+    reference = [sum(int(_cut_reference([low[i], value, high[i]], n_bins)[1]) * strides[i]
+                     for i, value in enumerate(state)) for state in states.tolist()]
+    results['rebuilt_bins_us'] = (time.perf_counter() - start) / n_lookups * 1e6
+    if pd is None:
+        expected = reference
+
+    start = time.perf_counter()
+    indices = [discretizer.index(state) for state in states.tolist()]
+    results['index_us'] = (time.perf_counter() - start) / n_lookups * 1e6
+
+    batch = rng.uniform(size=(n_states, n_dimensions))
+    start = time.perf_counter()
+    batch_indices = discretizer.indices(batch)
+    results['indices_us'] = (time.perf_counter() - start) / n_states * 1e6
+
+    checked = [discretizer.index(state) for state in batch[:1000].tolist()]
+    results['agree'] = indices == expected and reference == expected and batch_indices[:1000].tolist() == checked
+    return results
+
+
+if __name__ == '__main__':
+    print(bench_discretizer())
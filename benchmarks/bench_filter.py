@@ -0,0 +1,270 @@
+"""
+Benchmark of the streaming filter, envelope, pipeline, filter bank and real-time runner against the per-sample loops
+of filter.py and its reference output wf.txt.
+"""
+
+
+import os
+import tempfile
+import time
+import numpy as np
+from scipy import signal
+from nzsci.dsp.envelope import Envelope
+from nzsci.dsp import filterbank
+from nzsci.dsp.pipeline import Decimate, Filter, Pipeline, Rectify, Smooth
+from nzsci.dsp.realtime import FileReplaySource, run_realtime
+from nzsci.dsp.streaming import StreamingFilter
+from nzsci.fileio import txtfile
+
+
+# 6th order band-pass of filter.py, 1000 Hz: design_filter('cheby1', 3, (26, 32), 1000, rp=0.5)
+B = [0.0000046818, 0, -0.0000140454, 0, 0.0000140454, 0, -0.0000046818]
+A = [1, -5.85422751575530, 14.3770740015921, -18.9564010023544, 14.1524743840052, -5.67275169886819,
+     0.953866160622467]
+
+SRC_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src.txt')
+# src.txt filtered by B, A from the steady state of a unit step, as saved by the original filter.py
+REFERENCE_FILE = os.path.join(os.path.dirname(SRC_FILE), 'wf.txt')
+
+
+def per_sample_lfilter(x):
+    """
+    Original real-time path of filter.py: one lfilter call per sample
+
+    :param numpy.array x: signal
+    :return: filtered signal
+    :rtype: numpy.array
+    """
+    zi = signal.lfilter_zi(B, A)
+    out = []
+    for sample in x:
+        z, zi = signal.lfilter(B, A, [sample], zi=zi)
+        out.append(z)
+    return np.concatenate(out)
+
+
+def list_smooth(x, window):
+    """
+    Original smooth() of filter.py: pop(0), append and mean over the whole window for each sample
+
+    :param list x: signal
+    :param int window: number of samples of the moving window
+    :return: moving average of the absolute value
+    :rtype: list
+    """
+    farray = [0] * window
+    out = []
+    for sample in x:
+        farray.pop(0)
+        farray.append(abs(sample))
+        out.append(np.mean(farray))
+    return out
+
+
+def bench_envelope(windows=(1, 100, 1000, 5000), n_samples=20000):
+    """
+    Per-sample cost of the original smooth() and of Envelope.process_sample, which should not depend on the window,
+    and throughput of the whole-array envelope
+
+    :param tuple windows: window sizes
+    :param int n_samples: number of samples of the synthetic signal
+    :return: results, one per window size
+    :rtype: list
+    """
+    x = np.random.default_rng(0).normal(size=n_samples)
+    samples = x.tolist()
+    results = []
+    for window in windows:
+        start = time.perf_counter()
+        reference = list_smooth(samples, window)
+        t_reference = time.perf_counter() - start
+
+        smoother = Envelope(window)
+        start = time.perf_counter()
+        out = [smoother.process_sample(sample) for sample in samples]
+        t_sample = time.perf_counter() - start
+
+        smoother = Envelope(window)
+        start = time.perf_counter()
+        smoother.process(x)
+        t_whole = time.perf_counter() - start
+        results.append({'window': window, 'list_smooth_us': t_reference / n_samples * 1e6,
+                        'process_sample_us': t_sample / n_samples * 1e6, 'process_us': t_whole / n_samples * 1e6,
+                        'max_error': float(np.max(np.abs(np.array(out) - reference)))})
+    return results
+
+
+def bench_streaming_filter(block_sizes=(1, 16, 256, 4096), n_channels=(1, 64), n_samples=100000):
+    """
+    Per-block latency and throughput of StreamingFilter, and its error against whole-signal lfilter on src.txt
+
+    :param tuple block_sizes: block sizes
+    :param tuple n_channels: numbers of channels
+    :param int n_samples: number of samples of the synthetic signal
+    :return: results
+    :rtype: dict
+    """
+    x = txtfile.read_txt(SRC_FILE, 1000)[0][:, 0]
+    start = time.perf_counter()
+    reference = per_sample_lfilter(x)
+    t_reference = time.perf_counter() - start
+    whole, _ = signal.lfilter(B, A, x, zi=signal.lfilter_zi(B, A))
+    results = {'per_sample_lfilter': {'samples_per_second': len(x) / t_reference,
+                                      'max_error': float(np.max(np.abs(reference - whole)))},
+               'streaming': []}
+
+    rng = np.random.default_rng(0)
+    for channels in n_channels:
+        data = rng.normal(size=(n_samples, channels))
+        for block_size in block_sizes:
+            streaming = StreamingFilter(B, A, n_channels=channels, zi='steady')
+            latencies = []
+            for i in range(0, n_samples, block_size):
+                start = time.perf_counter()
+                streaming.process(data[i:i + block_size])
+                latencies.append(time.perf_counter() - start)
+            results['streaming'].append({
+                'n_channels': channels, 'block_size': block_size,
+                'latency_mean': float(np.mean(latencies)), 'latency_p99': float(np.percentile(latencies, 99)),
+                'samples_per_second': n_samples * channels / float(np.sum(latencies))})
+
+    streaming = StreamingFilter(B, A, zi='steady')
+    start = time.perf_counter()
+    out = np.array([streaming.process_sample(sample) for sample in x.tolist()])
+    results['process_sample'] = {'samples_per_second': len(x) / (time.perf_counter() - start),
+                                 'max_error': float(np.max(np.abs(out - whole)))}
+
+    streaming = StreamingFilter(B, A, zi='steady')
+    blocks = np.array_split(x, np.arange(37, len(x), 37))
+    out = np.concatenate([streaming.process(block) for block in blocks])
+    results['streaming_max_error'] = float(np.max(np.abs(out - whole)))
+    return results
+
+
+def bench_reference_filter(block_size=10, tolerance=1e-6):
+    """
+    Whole-signal and per-sample filter paths of filter.py on src.txt: time and largest difference with wf.txt
+
+    :param int block_size: number of samples per block of the streaming path
+    :param float tolerance: largest difference allowed, the coefficients of B, A are rounded
+    :return: results, one per path
+    :rtype: list
+    :raise AssertionError: If a path differs from the reference output by more than the tolerance
+    """
+    x = txtfile.read_txt(SRC_FILE, 1000)[0][:, 0]
+    reference = txtfile.read_txt(REFERENCE_FILE, 1000)[0][:, 0]
+    sos = filterbank.design_filter('cheby1', 3, (26, 32), 1000, rp=0.5)['sos']
+
+    def stream_blocks(samples):
+        streaming = StreamingFilter(sos=sos, zi='steady')
+        return np.concatenate([streaming.process(samples[i:i + block_size])
+                               for i in range(0, len(samples), block_size)])
+
+    def stream_samples(samples):
+        streaming = StreamingFilter(sos=sos, zi='steady')
+        return np.array([streaming.process_sample(sample) for sample in samples.tolist()])
+
+    paths = [('whole_lfilter', lambda samples: signal.lfilter(B, A, samples, zi=signal.lfilter_zi(B, A))[0]),
+             ('whole_pipeline', lambda samples: Pipeline([Filter(sos=sos, zi='steady')]).run(samples, 1000)),
+             ('per_sample_lfilter', per_sample_lfilter),
+             ('process_sample', stream_samples),
+             ('streaming_blocks', stream_blocks)]
+    results = []
+    for name, path in paths:
+        start = time.perf_counter()
+        out = np.ravel(path(x))
+        elapsed = time.perf_counter() - start
+        results.append({'path': name, 'seconds': elapsed, 'samples_per_second': len(x) / elapsed,
+                        'max_error': float(np.max(np.abs(out - reference)))})
+        if results[-1]['max_error'] > tolerance:
+            raise AssertionError('%s differs from the reference output by %g.' % (name, results[-1]['max_error']))
+    return results
+
+
+def bench_pipeline(n_channels=64, n_samples=100000, executors=('serial', 'process'), n_workers=None):
+    """
+    Offline filter, rectify, smooth and decimate chain on a multichannel recording, channels spread over workers
+
+    :param int n_channels: number of channels
+    :param int n_samples: number of samples per channel
+    :param tuple executors: executors of the pipeline
+    :param int n_workers: number of groups of channels
+    :return: results, one per executor
+    :rtype: list
+    """
+    data = np.random.default_rng(0).normal(size=(n_samples, n_channels))
+    results = []
+    for executor in executors:
+        pipeline = Pipeline([Filter(B, A, zi='steady'), Rectify(), Smooth(100), Decimate(10)], executor=executor,
+                            n_workers=n_workers)
+        start = time.perf_counter()
+        pipeline.run(data, 1000)
+        elapsed = time.perf_counter() - start
+        results.append({'executor': executor, 'n_channels': n_channels, 'seconds': elapsed,
+                        'samples_per_second': n_samples * n_channels / elapsed})
+    return results
+
+
+def bench_filterbank(n_files=200, n_samples=2000, n_channels=4, kind='butter', order=4):
+    """
+    8-band decomposition of many short files: designing the bank for every file, with the memory cache and with the
+    disk cache only (as in a new process)
+
+    :param int n_files: number of files
+    :param int n_samples: number of samples per file
+    :param int n_channels: number of channels per file
+    :param str kind: filter type
+    :param int order: order of the filters
+    :return: time per file (s) of each case
+    :rtype: dict
+    """
+    bands = [(4 * i + 2, 4 * i + 6) for i in range(8)]
+    data = np.random.default_rng(0).normal(size=(n_samples, n_channels))
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for case in ('redesign', 'memory', 'disk'):
+            filterbank.clear_design_cache()
+            start = time.perf_counter()
+            for _ in range(n_files):
+                if case != 'memory':
+                    filterbank.clear_design_cache()
+                bank = filterbank.FilterBank(bands, kind=kind, order=order, fs=1000,
+                                             cache_dir=cache_dir if case == 'disk' else None)
+                bank.apply(data)
+            results[case] = (time.perf_counter() - start) / n_files
+    return results
+
+
+def bench_realtime(block_sizes=(1, 10, 100), n_channels=8, n_samples=20000, overflow='block'):
+    """
+    Latency of the real-time runner on a recording replayed as fast as possible through a filter, rectify and
+    smooth pipeline
+
+    :param tuple block_sizes: block sizes
+    :param int n_channels: number of channels
+    :param int n_samples: number of samples per channel
+    :param str overflow: overflow policy of the queues
+    :return: results, one per block size
+    :rtype: list
+    """
+    data = np.random.default_rng(0).normal(size=(n_samples, n_channels))
+    results = []
+    for block_size in block_sizes:
+        pipeline = Pipeline([Filter(B, A, zi='steady'), Rectify(), Smooth(100)])
+        start = time.perf_counter()
+        stats = run_realtime(FileReplaySource(data, 1000, block_size, speed=None), pipeline, [lambda block: None],
+                             overflow=overflow)
+        elapsed = time.perf_counter() - start
+        results.append({'block_size': block_size, 'n_blocks': stats['n_blocks'], 'dropped': stats['dropped'],
+                        'latency_p50': stats['latency_p50'], 'latency_p99': stats['latency_p99'],
+                        'samples_per_second': n_samples / elapsed})
+    return results
+
+
+if __name__ == '__main__':
+    print(bench_reference_filter())
+    print(bench_streaming_filter())
+    print(bench_envelope())
+    print(bench_pipeline())
+    print(bench_filterbank())
+    print(bench_realtime())
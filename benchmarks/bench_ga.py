@@ -0,0 +1,108 @@
+"""
+Benchmark of the genetic algorithms on standard test functions.
+"""
+
+
+import random
+import time
+import numpy as np
+from nzsci.optimization.genetic_algorithm import GeneticAlgorithm
+from nzsci.optimization.numpy_genetic_algorithm import NumpyGeneticAlgorithm
+
+
+def sphere(x):
+    """
+    Sphere function, minimum 0 at the origin
+
+    :param numpy.array x: points, one per row (last axis)
+    :return: values
+    :rtype: numpy.array
+    """
+    x = np.asarray(x, dtype=float)
+    return np.sum(x * x, axis=-1)
+
+
+def rastrigin(x):
+    """
+    Rastrigin function, many regularly spaced local minima, global minimum 0 at the origin
+
+    :param numpy.array x: points, one per row (last axis)
+    :return: values
+    :rtype: numpy.array
+    """
+    x = np.asarray(x, dtype=float)
+    return 10 * x.shape[-1] + np.sum(x * x - 10 * np.cos(2 * np.pi * x), axis=-1)
+
+
+def rosenbrock(x):
+    """
+    Rosenbrock function, minimum 0 at (1, ..., 1) at the end of a long flat valley
+
+    :param numpy.array x: points, one per row (last axis)
+    :return: values
+    :rtype: numpy.array
+    """
+    x = np.asarray(x, dtype=float)
+    return np.sum(100 * (x[..., 1:] - x[..., :-1] ** 2) ** 2 + (1 - x[..., :-1]) ** 2, axis=-1)
+
+
+def ackley(x):
+    """
+    Ackley function, nearly flat outer region and a deep hole, minimum 0 at the origin
+
+    :param numpy.array x: points, one per row (last axis)
+    :return: values
+    :rtype: numpy.array
+    """
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    return (-20 * np.exp(-0.2 * np.sqrt(np.sum(x * x, axis=-1) / n))
+            - np.exp(np.sum(np.cos(2 * np.pi * x), axis=-1) / n) + 20 + np.e)
+
+
+# function to minimize, half width of the usual search domain
+TEST_FUNCTIONS = {'sphere': (sphere, 5.12), 'rastrigin': (rastrigin, 5.12), 'rosenbrock': (rosenbrock, 2.048),
+                  'ackley': (ackley, 32.768)}
+
+
+def bench_ga(functions=('sphere', 'rastrigin', 'rosenbrock', 'ackley'), pop_sizes=(20, 50, 100), n_genes=4,
+             max_gen=50, accuracy=0.001, engines=('python', 'numpy'), seed=0):
+    """
+    Time of GeneticAlgorithm.run (one fitness call per individual) and of NumpyGeneticAlgorithm.run (one batched
+    fitness call per generation) minimizing test functions, and the best value found
+
+    :param tuple functions: names of the test functions, see TEST_FUNCTIONS
+    :param tuple pop_sizes: population sizes
+    :param int n_genes: number of parameters of the test functions
+    :param int max_gen: number of generations
+    :param float accuracy: accuracy of the parameters
+    :param tuple engines: 'python' for GeneticAlgorithm, 'numpy' for NumpyGeneticAlgorithm
+    :param int seed: seed of the random generators
+    :return: results, one per function, population size and engine
+    :rtype: list
+    """
+    results = []
+    for name in functions:
+        func, bound = TEST_FUNCTIONS[name]
+        parameters_range = [[-bound, bound, accuracy]] * n_genes
+        for pop_size in pop_sizes:
+            for engine in engines:
+                random.seed(seed)
+                if engine == 'numpy':
+                    ga = NumpyGeneticAlgorithm(max_gen, pop_size, 0.8, 0.05, n_genes, parameters_range,
+                                               batch_fitness_func=lambda p: -func(p), progress=False, seed=seed)
+                else:
+                    ga = GeneticAlgorithm(max_gen, pop_size, 0.8, 0.05, n_genes, parameters_range,
+                                          fitness_func=lambda p: -float(func(p)), progress=False)
+                start = time.perf_counter()
+                ga.run()
+                elapsed = time.perf_counter() - start
+                results.append({'function': name, 'pop_size': pop_size, 'engine': engine, 'seconds': elapsed,
+                                'evaluations_per_second': pop_size * (ga.generation_number + 1) / elapsed,
+                                'best': -float(ga.best_fitness)})
+    return results
+
+
+if __name__ == '__main__':
+    for result in bench_ga():
+        print(result)
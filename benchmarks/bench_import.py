@@ -0,0 +1,73 @@
+"""
+Import time of the package measured in fresh interpreters (python -X importtime), and a budget check failing when a
+cold import nzsci gets slow or loads heavy dependencies.
+"""
+
+
+import os
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ('numpy', 'scipy', 'matplotlib', 'seaborn', 'pandas', 'progressbar')
+
+
+def _import_in_subprocess(module):
+    # cumulative import time (us) of every module imported by a fresh interpreter running "import module"
+    path = [p for p in sys.path if p and os.path.isdir(p)]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path))
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module], env=env,
+                               capture_output=True, text=True, check=True, cwd=os.path.dirname(sys.executable))
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def bench_import(modules=('nzsci', 'nzsci.optimization.genetic_algorithm', 'nzsci.fileio.txtfile',
+                          'nzsci.dsp.pipeline'), repeat=5):
+    """
+    Cold import time of modules, best of several fresh interpreters, and the heavy dependencies each one loads
+
+    :param tuple modules: names of the modules
+    :param int repeat: number of interpreters per module
+    :return: results, one per module: 'import_ms' and 'heavy_modules'
+    :rtype: list
+    """
+    results = []
+    for module in modules:
+        best = None
+        for _ in range(repeat):
+            times = _import_in_subprocess(module)
+            if best is None or times[module] < best[module]:
+                best = times
+        results.append({'module': module, 'import_ms': best[module] / 1e3,
+                        'heavy_modules': [name for name in HEAVY_MODULES if name in best]})
+    return results
+
+
+def check_import_budget(budget_ms=20.0, module='nzsci', repeat=5):
+    """
+    Check that a cold import of a module is within a time budget and loads no heavy dependency.
+
+    :param float budget_ms: maximum import time (ms), best of repeat interpreters
+    :param str module: name of the module
+    :param int repeat: number of interpreters
+    :return: import time (ms)
+    :rtype: float
+    :raise AssertionError: If the budget is exceeded or a heavy dependency is loaded
+    """
+    result = bench_import((module,), repeat=repeat)[0]
+    if result['heavy_modules']:
+        raise AssertionError('import %s loads %s' % (module, ', '.join(result['heavy_modules'])))
+    if result['import_ms'] > budget_ms:
+        raise AssertionError('import %s takes %.1f ms, budget %.1f ms' % (module, result['import_ms'], budget_ms))
+    return result['import_ms']
+
+
+if __name__ == '__main__':
+    print(bench_import())
+    print('import nzsci: %.2f ms' % check_import_budget())
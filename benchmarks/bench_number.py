@@ -0,0 +1,53 @@
+"""
+Benchmark of the binary and gray code conversions of math.number, string functions against their array counterparts.
+"""
+
+
+import time
+import numpy as np
+from nzsci.math import number
+
+
+def _per_value(func, values):
+    start = time.perf_counter()
+    out = func(values)
+    return (time.perf_counter() - start) / len(values) * 1e6, out
+
+
+def bench_number(n_values=100000, n_bits=32, seed=0):
+    """
+    Time per value (us) of every conversion, one call per value for the string functions and one call per array for
+    the array ones, and whether both give the same codes
+
+    :param int n_values: number of random integers converted
+    :param int n_bits: number of bits of the integers
+    :param int seed: seed of the random integers
+    :return: results
+    :rtype: dict
+    """
+    values = np.random.default_rng(seed).integers(0, 2 ** n_bits, size=n_values, dtype=np.uint64)
+    ints = values.tolist()
+    results = {'n_values': n_values, 'n_bits': n_bits}
+
+    results['int2bin_us'], bins = _per_value(lambda v: [number.int2bin(n, n_bits) for n in v], ints)
+    results['bin2int_us'], back = _per_value(lambda v: [number.bin2int(b) for b in v], bins)
+    results['bin2gray_us'], grays = _per_value(lambda v: [number.bin2gray(b) for b in v], bins)
+    results['gray2bin_us'], _ = _per_value(lambda v: [number.gray2bin(g) for g in v], grays)
+    results['int2gray_us'], _ = _per_value(lambda v: [number.int2gray(n, n_bits) for n in v], ints)
+    results['gray2int_us'], decoded = _per_value(lambda v: [number.gray2int(g) for g in v], grays)
+
+    results['unpack_bits_us'], bits = _per_value(lambda v: number.unpack_bits(v, n_bits), values)
+    results['pack_bits_us'], packed = _per_value(number.pack_bits, bits)
+    results['int2gray_array_us'], gray_array = _per_value(number.int2gray_array, values)
+    results['gray2int_array_us'], decoded_array = _per_value(number.gray2int_array, gray_array)
+
+    gray_bits = number.unpack_bits(gray_array, n_bits)
+    results['agree'] = (back == ints and decoded == ints and packed.tolist() == ints and
+                        decoded_array.tolist() == ints and
+                        [''.join(map(str, row)) for row in bits.tolist()] == bins and
+                        [''.join(map(str, row)) for row in gray_bits.tolist()] == grays)
+    return results
+
+
+if __name__ == '__main__':
+    print(bench_number())
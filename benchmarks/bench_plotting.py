@@ -0,0 +1,44 @@
+"""
+Benchmark of the plotting decimation: cost of a zoom with and without the min/max pyramid.
+"""
+
+
+import time
+import numpy as np
+from nzsci.plotting.decimation import MinMaxPyramid, lttb, minmax_decimate
+
+
+def bench_decimation(n_samples=10000000, n_bins=1000, spans=(1.0, 0.1, 0.001)):
+    """
+    Time to decimate a visible range (a fraction of the signal) directly from the samples, from the pyramid, and from
+    the pyramid followed by LTTB
+
+    :param int n_samples: number of samples of the synthetic signal
+    :param int n_bins: number of bins (pixels)
+    :param tuple spans: visible fractions of the signal
+    :return: time to build the pyramid (s) and results, one per span
+    :rtype: dict
+    """
+    x = np.cumsum(np.random.default_rng(0).normal(size=n_samples))
+    start = time.perf_counter()
+    pyramid = MinMaxPyramid(x)
+    results = {'pyramid_seconds': time.perf_counter() - start, 'spans': []}
+    for span in spans:
+        stop = int(n_samples * span)
+        start = time.perf_counter()
+        indices, _ = minmax_decimate(x, n_bins, 0, stop)
+        t_direct = time.perf_counter() - start
+        start = time.perf_counter()
+        pyramid.decimate(0, stop, n_bins)
+        t_pyramid = time.perf_counter() - start
+        start = time.perf_counter()
+        fine_indices, fine_values = pyramid.decimate(0, stop, 4 * n_bins)
+        lttb(fine_values, 2 * n_bins, x=fine_indices)
+        t_lttb = time.perf_counter() - start
+        results['spans'].append({'span': span, 'n_points': len(indices), 'direct_seconds': t_direct,
+                                 'pyramid_seconds': t_pyramid, 'pyramid_lttb_seconds': t_lttb})
+    return results
+
+
+if __name__ == '__main__':
+    print(bench_decimation())
@@ -0,0 +1,52 @@
+"""
+Benchmark of the sliding window regression against refitting every window.
+"""
+
+
+import time
+import numpy as np
+from nzsci.math.regression import SlidingRegression, linear_fit, sliding_regression
+
+
+def bench_sliding_regression(n_samples=100000, windows=(10, 100, 1000), n_refits=2000):
+    """
+    Time per window of a full refit (linear_fit), of SlidingRegression updates and of the vectorized
+    sliding_regression, and the largest slope difference with the refits
+
+    :param int n_samples: number of samples of the synthetic signal
+    :param tuple windows: window sizes
+    :param int n_refits: number of windows refitted (refitting all of them is too slow)
+    :return: results, one per window size
+    :rtype: list
+    """
+    rng = np.random.default_rng(0)
+    y = np.cumsum(rng.normal(size=n_samples))
+    results = []
+    for window in windows:
+        n_windows = n_samples - window + 1
+        starts = np.linspace(0, n_windows - 1, n_refits).astype(int)
+        start = time.perf_counter()
+        reference = np.array([linear_fit(np.arange(s, s + window), y[s:s + window])[0] for s in starts])
+        t_refit = (time.perf_counter() - start) / n_refits
+
+        regression = SlidingRegression(window)
+        online = []
+        start = time.perf_counter()
+        for i, value in enumerate(y.tolist()):
+            regression.update(i, value)
+            online.append(regression.slope)
+        t_online = (time.perf_counter() - start) / n_windows
+
+        start = time.perf_counter()
+        slopes, _ = sliding_regression(y, window)
+        t_vectorized = (time.perf_counter() - start) / n_windows
+        online = np.array(online[window - 1:])
+        results.append({'window': window, 'refit_us': t_refit * 1e6, 'online_us': t_online * 1e6,
+                        'vectorized_us': t_vectorized * 1e6,
+                        'online_max_error': float(np.max(np.abs(online[starts] - reference))),
+                        'vectorized_max_error': float(np.max(np.abs(slopes[starts] - reference)))})
+    return results
+
+
+if __name__ == '__main__':
+    print(bench_sliding_regression())
@@ -0,0 +1,65 @@
+"""
+Benchmark of the parameter grid sweep against materializing the grid with itertools.product.
+"""
+
+
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+from nzsci.optimization.sweep import ParameterGrid, Sweep
+
+
+def _objective(a, b, c, d):
+    return (a - 3) ** 2 + (b - 7) ** 2 + (c - 1) ** 2 + (d - 5) ** 2
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_sweep(sizes=(10, 20, 30), chunk_size=10000, executor='process', n_workers=None):
+    """
+    Peak memory of indexing a grid (list of the product against ParameterGrid), and time of a full sweep with its
+    result store, of a resumed sweep (nothing left to evaluate) and of a best() scan
+
+    :param tuple sizes: number of values of each of the 4 parameters, one grid per size
+    :param int chunk_size: number of combinations per chunk
+    :param executor: executor of the sweep, see Sweep
+    :param int n_workers: number of workers
+    :return: results, one per grid
+    :rtype: list
+    """
+    results = []
+    for size in sizes:
+        parameters = [range(size)] * 4
+        grid = ParameterGrid(parameters)
+        last = len(grid) - 1
+        peak_product = _peak_memory(lambda: list(itertools.product(*parameters))[last])
+        peak_grid = _peak_memory(lambda: ParameterGrid(parameters)[last])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, 'sweep.pkl')
+            sweep = Sweep(_objective, grid, filename, chunk_size=chunk_size, executor=executor, n_workers=n_workers)
+            start = time.perf_counter()
+            sweep.run()
+            t_run = time.perf_counter() - start
+            start = time.perf_counter()
+            sweep.run()
+            t_resume = time.perf_counter() - start
+            start = time.perf_counter()
+            best = sweep.best(maximize=False)
+            t_best = time.perf_counter() - start
+        results.append({'n_combinations': len(grid), 'product_peak_mb': peak_product / 1e6,
+                        'grid_peak_mb': peak_grid / 1e6, 'run_s': t_run, 'resume_s': t_resume, 'best_s': t_best,
+                        'combinations_per_s': len(grid) / t_run, 'best': best[1]})
+    return results
+
+
+if __name__ == '__main__':
+    print(bench_sweep())
@@ -0,0 +1,141 @@
+"""
+Benchmark of fileio.txtfile against the original line by line implementation.
+"""
+
+
+import os
+import tempfile
+import time
+import numpy as np
+from nzsci.fileio import txtfile
+
+
+def read_txt_lines(filename, sampling_rate=0):
+    """
+    Original read_txt: readlines() and one float() per cell, kept as the reference of the benchmark
+
+    :param str filename: filename of the data.
+    :param float sampling_rate: sampling rate (Hz)
+    :return: data matrix, header('sampling_rate', 'n_points', 'n_channels')
+    :rtype: numpy.array, dict
+    """
+    with open(filename, 'r') as data_file:
+        lines = data_file.readlines()
+
+    if sampling_rate == 0:
+        hdr = {'sampling_rate': float(lines[0].split()[0])}
+        del lines[0]
+    else:
+        hdr = {'sampling_rate': sampling_rate}
+
+    hdr['n_points'] = len(lines)
+    hdr['n_channels'] = len(lines[0].split())
+
+    data = np.zeros([hdr['n_points'], hdr['n_channels']])
+    for i in range(hdr['n_points']):
+        row = lines[i].rstrip('\n').split()
+        for j in range(hdr['n_channels']):
+            data[i, j] = float(row[j])
+
+    return data, hdr
+
+
+def save_txt_cells(data, sampling_rate, filename):
+    """
+    Original save_txt: one write and one str() per cell, kept as the reference of the benchmark
+
+    :param numpy.array data: data matrix
+    :param float sampling_rate: sampling rate
+    :param str filename: file name
+    """
+    shape = np.shape(data)
+
+    with open(filename, 'x') as data_file:
+        data_file.write(str(sampling_rate)+'\n')
+        for i in range(shape[0]):
+            for j in range(shape[1]):
+                data_file.write(str(data[i, j]))
+                data_file.write('  ')
+            data_file.write('\n')
+
+
+def write_signal(filename, n_rows, n_channels, seed=0):
+    """
+    Write a random signal file with a header line
+
+    :param str filename: file name
+    :param int n_rows: number of samples
+    :param int n_channels: number of channels
+    :param int seed: seed of the random signal
+    """
+    data = np.random.default_rng(seed).normal(size=(n_rows, n_channels))
+    with open(filename, 'w') as data_file:
+        data_file.write('1000\t%d\n' % n_channels)
+        np.savetxt(data_file, data, delimiter='\t', fmt='%.9g')
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    ret = func(*args, **kwargs)
+    return time.perf_counter() - start, ret
+
+
+def bench_read_txt(n_rows=1000000, n_channels=4):
+    """
+    Time read_txt (float64, float32 and one selected column) against the original parser
+
+    :param int n_rows: number of samples of the file
+    :param int n_channels: number of channels of the file
+    :return: timings in seconds and speedup
+    :rtype: dict
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, 'signal.txt')
+        write_signal(filename, n_rows, n_channels)
+        t_reference, (reference, _) = _timed(read_txt_lines, filename)
+        t_float64, (data, hdr) = _timed(txtfile.read_txt, filename)
+        t_float32, _ = _timed(txtfile.read_txt, filename, dtype=np.float32)
+        t_column, _ = _timed(txtfile.read_txt, filename, columns=[0])
+    if not np.array_equal(reference, data) or hdr['n_points'] != n_rows:
+        raise AssertionError('read_txt differs from the reference parser.')
+    return {'n_rows': n_rows, 'n_channels': n_channels, 'reference': t_reference, 'read_txt': t_float64,
+            'read_txt_float32': t_float32, 'read_txt_one_column': t_column, 'speedup': t_reference / t_float64}
+
+
+def bench_save_txt(n_rows=1000000, n_channels=4):
+    """
+    Time save_txt (plain, '%.6g' and gzip) against the original per-cell writer and check the round trip
+
+    :param int n_rows: number of samples
+    :param int n_channels: number of channels
+    :return: timings in seconds and speedup
+    :rtype: dict
+    """
+    data = np.random.default_rng(0).normal(size=(n_rows, n_channels))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        t_reference, _ = _timed(save_txt_cells, data, 1000, os.path.join(tmp_dir, 'reference.txt'))
+        t_plain, _ = _timed(txtfile.save_txt, data, 1000, os.path.join(tmp_dir, 'plain.txt'))
+        t_short, _ = _timed(txtfile.save_txt, data, 1000, os.path.join(tmp_dir, 'short.txt'), fmt='%.6g')
+        t_gzip, _ = _timed(txtfile.save_txt, data, 1000, os.path.join(tmp_dir, 'plain.txt.gz'))
+        for name in ('plain.txt', 'plain.txt.gz'):
+            if not np.array_equal(txtfile.read_txt(os.path.join(tmp_dir, name))[0], data):
+                raise AssertionError('save_txt does not round trip through read_txt.')
+    return {'n_rows': n_rows, 'n_channels': n_channels, 'reference': t_reference, 'save_txt': t_plain,
+            'save_txt_6g': t_short, 'save_txt_gzip': t_gzip, 'speedup': t_reference / t_plain}
+
+
+def bench_txtfile(sizes=(10000, 100000, 1000000), n_channels=4):
+    """
+    bench_read_txt and bench_save_txt at several file sizes
+
+    :param tuple sizes: numbers of samples
+    :param int n_channels: number of channels
+    :return: results, one per size: 'read' and 'save'
+    :rtype: list
+    """
+    return [{'read': bench_read_txt(n_rows, n_channels), 'save': bench_save_txt(n_rows, n_channels)}
+            for n_rows in sizes]
+
+
+if __name__ == '__main__':
+    print(bench_txtfile())
@@ -0,0 +1,134 @@
+"""
+Runner of the benchmark suite: run some or all benchmarks and write their results to a JSON file, optionally compared
+with the file of an earlier run. The exit status is 1 when a benchmark fails, e.g. the import time budget check.
+
+    python -m nzsci.benchmarks.run --output results.json [--quick] [--baseline old.json] [name ...]
+"""
+
+
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import sys
+import time
+import numpy as np
+
+
+# name: module, function, arguments of a quick run (the defaults of the function are the full run)
+SUITE = {
+    'ga': ('bench_ga', 'bench_ga', {'pop_sizes': (20, 50), 'max_gen': 20}),
+    'number': ('bench_number', 'bench_number', {'n_values': 10000}),
+    'txtfile': ('bench_txtfile', 'bench_txtfile', {'sizes': (1000, 10000)}),
+    'reference_filter': ('bench_filter', 'bench_reference_filter', {}),
+    'streaming_filter': ('bench_filter', 'bench_streaming_filter', {'block_sizes': (1, 256), 'n_samples': 10000}),
+    'envelope': ('bench_filter', 'bench_envelope', {'windows': (100, 1000), 'n_samples': 5000}),
+    'pipeline': ('bench_filter', 'bench_pipeline', {'n_channels': 8, 'n_samples': 10000, 'executors': ('serial',)}),
+    'filterbank': ('bench_filter', 'bench_filterbank', {'n_files': 20}),
+    'realtime': ('bench_filter', 'bench_realtime', {'block_sizes': (10,), 'n_samples': 2000}),
+    'decimation': ('bench_plotting', 'bench_decimation', {'n_samples': 1000000}),
+    'sliding_regression': ('bench_regression', 'bench_sliding_regression', {'n_samples': 10000, 'n_refits': 200}),
+    'sweep': ('bench_sweep', 'bench_sweep', {'sizes': (10,), 'executor': 'serial'}),
+    'discretizer': ('bench_discretizer', 'bench_discretizer', {'n_lookups': 2000, 'n_states': 100000}),
+    'import': ('bench_import', 'bench_import', {'repeat': 2}),
+    'import_budget': ('bench_import', 'check_import_budget', {'repeat': 2}),
+}
+
+
+def _to_json(value):
+    # numpy scalars and arrays in the results
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError('Not serializable: ' + type(value).__name__)
+
+
+def run(names=None, quick=False):
+    """
+    Run benchmarks of the suite, a failing benchmark is recorded with its error and the others still run.
+
+    :param list names: names of the benchmarks (see SUITE), None for all
+    :param bool quick: run with small sizes, e.g. to check that the suite works
+    :return: report: 'environment' (python, numpy, platform, date) and 'benchmarks' (per name 'seconds' and 'result'
+             or 'error')
+    :rtype: dict
+    :raise ValueError: If a benchmark name is unknown
+    """
+    names = list(SUITE) if not names else list(names)
+    unknown = [name for name in names if name not in SUITE]
+    if unknown:
+        raise ValueError('Unknown benchmarks: ' + ', '.join(unknown))
+    report = {'environment': {'python': platform.python_version(), 'numpy': np.__version__,
+                              'platform': platform.platform(), 'date': datetime.datetime.now().isoformat(),
+                              'quick': quick},
+              'benchmarks': {}}
+    for name in names:
+        module, function, quick_kwargs = SUITE[name]
+        func = getattr(importlib.import_module('nzsci.benchmarks.' + module), function)
+        start = time.perf_counter()
+        try:
+            entry = {'result': func(**(quick_kwargs if quick else {}))}
+        except Exception as error:
+            entry = {'error': '%s: %s' % (type(error).__name__, error)}
+        entry['seconds'] = time.perf_counter() - start
+        report['benchmarks'][name] = entry
+    return report
+
+
+def _flatten(value, prefix=''):
+    # numeric leaves of a report as {path: value}
+    if isinstance(value, bool):
+        return {}
+    if isinstance(value, (int, float)):
+        return {prefix: value}
+    items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    flat = {}
+    for key, item in items:
+        flat.update(_flatten(item, '%s/%s' % (prefix, key) if prefix else str(key)))
+    return flat
+
+
+def compare(baseline, report):
+    """
+    Ratio of every numeric result of a report to the same result of a baseline report.
+
+    :param dict baseline: earlier report
+    :param dict report: new report
+    :return: {path: (baseline value, new value, new / baseline)} for the results present in both
+    :rtype: dict
+    """
+    old = _flatten(baseline['benchmarks'])
+    new = _flatten(report['benchmarks'])
+    return {path: (old[path], value, value / old[path] if old[path] else float('nan'))
+            for path, value in new.items() if path in old}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the nzsci benchmark suite.')
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all by default: ' + ', '.join(SUITE))
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file of the results')
+    parser.add_argument('--quick', action='store_true', help='small sizes, to check that the suite runs')
+    parser.add_argument('--baseline', help='JSON file of an earlier run to compare with')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in SUITE]
+    if unknown:
+        parser.error('unknown benchmarks: ' + ', '.join(unknown))
+
+    text = json.dumps(run(args.names, quick=args.quick), indent=2, default=_to_json)
+    with open(args.output, 'w') as result_file:
+        result_file.write(text)
+    report = json.loads(text)
+    for name, entry in report['benchmarks'].items():
+        print('%-20s %8.2f s  %s' % (name, entry['seconds'], entry.get('error', 'ok')))
+    if args.baseline:
+        with open(args.baseline, 'r') as baseline_file:
+            baseline = json.load(baseline_file)
+        for path, (old, new, ratio) in sorted(compare(baseline, report).items()):
+            print('%-60s %12.6g %12.6g  x%.3f' % (path, old, new, ratio))
+    return 1 if any('error' in entry for entry in report['benchmarks'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
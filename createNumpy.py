@@ -5,7 +5,6 @@
 #  [0. 0. 0. 0. 0. 0. 0. 0. 0. 0.]
 #  [0. 0. 0. 0. 0. 0. 0. 0. 0. 0.]]
 import numpy as np
-import matplotlib.pyplot as plt
 
 # create array
 s = np.zeros(10)
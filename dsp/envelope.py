@@ -0,0 +1,180 @@
+"""
+Envelope extraction: rectification followed by moving average, moving RMS or exponential smoothing.
+"""
+
+
+import math
+import numpy as np
+from scipy import signal
+
+
+METHODS = ('mean', 'rms', 'exponential')
+_CHUNK_SIZE = 8192  # long blocks are summed by chunks, cumulative sums lose precision as they grow
+
+
+class Envelope:
+    """
+    Stateful envelope smoother. The moving average and the moving RMS keep a ring buffer of the last window samples
+    and a running sum, so a sample costs the same whatever the window size; the running sum is recomputed every time
+    the ring buffer wraps around so rounding errors don't accumulate. The window starts filled with zeros.
+    """
+
+    def __init__(self, window=100, method='mean', alpha=None, n_channels=1, rectify=True):
+        """
+        Constructor.
+
+        :param int window: number of samples of the moving window
+        :param str method: 'mean' (moving average), 'rms' (moving root mean square) or 'exponential'
+                           (exponential moving average)
+        :param float alpha: smoothing factor of the exponential moving average, defaults to 2 / (window + 1)
+        :param int n_channels: number of channels (columns) of the blocks
+        :param bool rectify: smooth the absolute value of the signal
+        :raise ValueError: If the method is unknown or the window is not positive
+        """
+        if method not in METHODS:
+            raise ValueError('Unknown envelope method: ' + str(method))
+        if window < 1:
+            raise ValueError('Window should be at least 1 sample.')
+        self.window = int(window)
+        self.method = method
+        self.alpha = 2.0 / (window + 1) if alpha is None else float(alpha)
+        self.n_channels = n_channels
+        self.rectify = rectify
+        self.reset()
+        return
+
+    def reset(self):
+        """
+        Reset the smoother: empty (zero) window and zero exponential average.
+        """
+        self._ring = np.zeros((self.window, self.n_channels))
+        self._sums = np.zeros(self.n_channels)
+        self._pos = 0
+        self._sample_ring = None
+        self._sample_sums = None
+        self._level = [0.0] * self.n_channels
+        return
+
+    def _block_state(self):
+        # the ring buffer is held as nested lists while processing sample by sample
+        if self._sample_ring is not None:
+            self._ring = np.array(self._sample_ring, dtype=float).T
+            self._sums = np.array(self._sample_sums, dtype=float)
+            self._sample_ring = None
+            self._sample_sums = None
+        return
+
+    def _finish(self, sums):
+        mean = sums / self.window
+        if self.method == 'rms':
+            return np.sqrt(np.maximum(mean, 0.0))
+        return mean
+
+    def process(self, block):
+        """
+        Smooth the next block of samples.
+
+        :param numpy.array block: samples, shape (n_samples, n_channels), or (n_samples,) for a single channel
+        :return: envelope, same shape as the block
+        :rtype: numpy.array
+        :raise ValueError: If the number of channels of the block is wrong
+        """
+        block = np.asarray(block, dtype=float)
+        vector = block.ndim == 1
+        if vector:
+            block = block.reshape(-1, 1)
+        if block.shape[1] != self.n_channels:
+            raise ValueError('Block should have %d channels.' % self.n_channels)
+        step = max(self.window, _CHUNK_SIZE)
+        if self.method != 'exponential' and block.shape[0] > step:
+            out = np.concatenate([self.process(block[i:i + step]) for i in range(0, block.shape[0], step)])
+            return out[:, 0] if vector else out
+        values = np.abs(block) if self.rectify else block
+        if values.shape[0] == 0:
+            return values[:, 0] if vector else values
+
+        if self.method == 'exponential':
+            zi = (1.0 - self.alpha) * np.array(self._level)
+            out, _ = signal.lfilter([self.alpha], [1.0, self.alpha - 1.0], values, axis=0, zi=zi[None, :])
+            self._level = out[-1].tolist()
+            return out[:, 0] if vector else out
+
+        if self.method == 'rms':
+            values = values * values
+        self._block_state()
+        n = values.shape[0]
+        if n >= self.window:
+            history = np.concatenate((self._ring[self._pos:], self._ring[:self._pos], values))
+            sums = np.cumsum(history, axis=0)
+            sums = sums[self.window:] - sums[:n]
+            self._ring = history[-self.window:].copy()
+            self._pos = 0
+            self._sums = self._ring.sum(axis=0)
+        else:
+            index = (self._pos + np.arange(n)) % self.window
+            sums = self._sums + np.cumsum(values - self._ring[index], axis=0)
+            self._ring[index] = values
+            wrapped = self._pos + n >= self.window
+            self._pos = (self._pos + n) % self.window
+            self._sums = self._ring.sum(axis=0) if wrapped else sums[-1]
+        out = self._finish(sums)
+        return out[:, 0] if vector else out
+
+    def process_sample(self, sample):
+        """
+        Smooth one sample, without numpy overhead; process() and process_sample() can be mixed.
+
+        :param sample: the sample, a number for a single channel or one value per channel
+        :return: envelope, same shape as the input
+        :rtype: float or numpy.array
+        :raise ValueError: If the number of channels of the sample is wrong
+        """
+        scalar = np.ndim(sample) == 0
+        values = [float(sample)] if scalar else np.asarray(sample, dtype=float).ravel().tolist()
+        if len(values) != self.n_channels:
+            raise ValueError('Sample should have %d channels.' % self.n_channels)
+        if self.rectify:
+            values = [abs(x) for x in values]
+
+        if self.method == 'exponential':
+            level = self._level
+            for i, x in enumerate(values):
+                level[i] += self.alpha * (x - level[i])
+            return level[0] if scalar else np.array(level)
+
+        if self._sample_ring is None:
+            self._sample_ring = self._ring.T.tolist()
+            self._sample_sums = self._sums.tolist()
+        pos = self._pos
+        wrapped = pos + 1 == self.window
+        out = []
+        for i, (x, ring) in enumerate(zip(values, self._sample_ring)):
+            if self.method == 'rms':
+                x = x * x
+            total = self._sample_sums[i] + x - ring[pos]
+            ring[pos] = x
+            self._sample_sums[i] = math.fsum(ring) if wrapped else total
+            mean = total / self.window
+            if self.method == 'rms':
+                mean = math.sqrt(max(mean, 0.0))
+            out.append(mean)
+        self._pos = 0 if wrapped else pos + 1
+        return out[0] if scalar else np.array(out)
+
+
+def envelope(x, window=100, method='mean', alpha=None, rectify=True):
+    """
+    Envelope of a whole signal, the window starts filled with zeros like for Envelope. The moving average and the
+    moving RMS are computed from cumulative sums.
+
+    :param numpy.array x: signal, shape (n_samples,) or (n_samples, n_channels)
+    :param int window: number of samples of the moving window
+    :param str method: 'mean', 'rms' or 'exponential'
+    :param float alpha: smoothing factor of the exponential moving average, defaults to 2 / (window + 1)
+    :param bool rectify: smooth the absolute value of the signal
+    :return: envelope, same shape as x
+    :rtype: numpy.array
+    """
+    x = np.asarray(x, dtype=float)
+    n_channels = 1 if x.ndim == 1 else x.shape[1]
+    return Envelope(window, method, alpha=alpha, n_channels=n_channels, rectify=rectify).process(x)
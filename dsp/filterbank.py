@@ -0,0 +1,156 @@
+"""
+Filter design from (type, order, band, sampling rate) specifications, memoized in memory and optionally on disk, and
+filter banks applying many bands to a signal at once.
+"""
+
+
+import functools
+import hashlib
+import os
+import numpy as np
+from scipy import signal
+
+
+IIR_KINDS = ('butter', 'cheby1', 'cheby2', 'ellip', 'bessel')
+FIR_KINDS = ('fir',)
+
+
+def _spec(kind, order, band, fs, btype, rp, rs):
+    # normalized, hashable specification of a filter
+    if kind not in IIR_KINDS + FIR_KINDS:
+        raise ValueError('Unknown filter type: ' + str(kind))
+    band = tuple(float(f) for f in np.atleast_1d(band))
+    if btype is None:
+        btype = 'bandpass' if len(band) == 2 else 'lowpass'
+    rp = float(rp) if kind in ('cheby1', 'ellip') else None
+    rs = float(rs) if kind in ('cheby2', 'ellip') else None
+    return kind, int(order), band if len(band) == 2 else band[0], float(fs), btype, rp, rs
+
+
+def _design(spec):
+    kind, order, band, fs, btype, rp, rs = spec
+    if kind == 'fir':
+        taps = signal.firwin(order + 1, band, pass_zero=btype, fs=fs)
+        design = {'taps': taps, 'zi': signal.lfilter_zi(taps, [1.0])}
+    else:
+        sos = signal.iirfilter(order, band, rp=rp, rs=rs, btype=btype, ftype=kind, output='sos', fs=fs)
+        design = {'sos': sos, 'zi': signal.sosfilt_zi(sos)}
+    return design
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_design(spec, cache_dir):
+    if cache_dir is None:
+        design = _design(spec)
+    else:
+        filename = os.path.join(cache_dir, hashlib.sha1(repr(spec).encode('utf-8')).hexdigest() + '.npz')
+        design = None
+        if os.path.exists(filename):
+            with np.load(filename) as cached:
+                if str(cached['spec']) == repr(spec):
+                    design = {key: cached[key] for key in cached.files if key != 'spec'}
+        if design is None:
+            design = _design(spec)
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_filename = filename + '.tmp%d' % os.getpid()
+            with open(tmp_filename, 'wb') as cache_file:
+                np.savez(cache_file, spec=repr(spec), **design)
+            os.replace(tmp_filename, filename)
+    return design
+
+
+def design_filter(kind, order, band, fs, btype=None, rp=1.0, rs=40.0, cache_dir=None):
+    """
+    Design a filter, or get it from the cache. Designs are memoized in memory, and in cache_dir when it is given so
+    that other processes and later runs reuse them. The returned arrays are copies of the cached ones.
+
+    :param str kind: 'butter', 'cheby1', 'cheby2', 'ellip', 'bessel' (IIR) or 'fir' (windowed FIR, see firwin)
+    :param int order: order of the filter (of the prototype for band filters), number of taps - 1 for FIR
+    :param band: cutoff frequency (Hz), or (low, high) for band filters
+    :param float fs: sampling rate (Hz)
+    :param str btype: 'lowpass', 'highpass', 'bandpass' or 'bandstop', defaults to 'bandpass' for a (low, high)
+                      band and to 'lowpass' otherwise
+    :param float rp: maximum passband ripple (dB) of 'cheby1' and 'ellip'
+    :param float rs: minimum stopband attenuation (dB) of 'cheby2' and 'ellip'
+    :param str cache_dir: directory of the disk cache, None for the memory cache only
+    :return: design: 'sos' (second-order sections) for IIR or 'taps' for FIR, and 'zi' the steady state of a unit
+             step input (see sosfilt_zi and lfilter_zi)
+    :rtype: dict
+    :raise ValueError: If the filter type is unknown
+    """
+    design = _cached_design(_spec(kind, order, band, fs, btype, rp, rs), cache_dir)
+    return {key: value.copy() for key, value in design.items()}
+
+
+def clear_design_cache():
+    """
+    Empty the memory cache of design_filter, the disk cache is left untouched.
+    """
+    _cached_design.cache_clear()
+    return
+
+
+class FilterBank:
+    """
+    Bank of filters of the same type and order over several bands. FIR banks filter all bands and channels in one
+    FFT convolution, IIR banks run one sosfilt call per band over all channels.
+    """
+
+    def __init__(self, bands, kind='butter', order=4, fs=1000, btype=None, rp=1.0, rs=40.0, cache_dir=None):
+        """
+        Constructor, see design_filter.
+
+        :param list bands: one band per filter, a cutoff frequency or a (low, high) pair (Hz)
+        :param str kind: filter type
+        :param int order: order of the filters
+        :param float fs: sampling rate (Hz)
+        :param str btype: band type
+        :param float rp: maximum passband ripple (dB)
+        :param float rs: minimum stopband attenuation (dB)
+        :param str cache_dir: directory of the disk cache
+        """
+        self.bands = list(bands)
+        self.kind = kind
+        self.fs = fs
+        self.designs = [design_filter(kind, order, band, fs, btype=btype, rp=rp, rs=rs, cache_dir=cache_dir)
+                        for band in self.bands]
+        if kind in FIR_KINDS:
+            self._taps = np.stack([design['taps'] for design in self.designs])
+        return
+
+    def __len__(self):
+        return len(self.bands)
+
+    def apply(self, x, zi=None):
+        """
+        Filter a signal with every band.
+
+        :param numpy.array x: signal, shape (n_samples,) or (n_samples, n_channels)
+        :param str zi: initial state, None for a zero state or 'steady' for the steady state of a constant input
+                       equal to the first sample
+        :return: filtered signal, shape (n_bands, n_samples) or (n_bands, n_samples, n_channels)
+        :rtype: numpy.array
+        :raise ValueError: If zi is unknown
+        """
+        if zi not in (None, 'steady'):
+            raise ValueError('Unknown initial state: ' + str(zi))
+        x = np.asarray(x, dtype=float)
+        vector = x.ndim == 1
+        if vector:
+            x = x.reshape(-1, 1)
+        n_samples = x.shape[0]
+
+        if self.kind in FIR_KINDS:
+            n_pad = self._taps.shape[1] - 1
+            if zi == 'steady':
+                x = np.concatenate((np.repeat(x[:1], n_pad, axis=0), x))
+            out = signal.fftconvolve(x[None, :, :], self._taps[:, :, None], axes=1)
+            out = out[:, n_pad:n_pad + n_samples] if zi == 'steady' else out[:, :n_samples]
+        else:
+            out = np.empty((len(self.designs), n_samples, x.shape[1]))
+            for i, design in enumerate(self.designs):
+                if zi is None:
+                    out[i] = signal.sosfilt(design['sos'], x, axis=0)
+                else:
+                    out[i] = signal.sosfilt(design['sos'], x, axis=0, zi=design['zi'][:, :, None] * x[0])[0]
+        return out[:, :, 0] if vector else out
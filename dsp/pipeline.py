@@ -0,0 +1,379 @@
+"""
+Composable signal processing pipelines: a chain of stages (filter, rectify, smooth, decimate, write) applied to
+(n_samples, n_channels) blocks, offline on a whole recording or in streaming mode block by block.
+"""
+
+
+import concurrent.futures
+import contextlib
+import copy
+import os
+import numpy as np
+from scipy import signal
+from nzsci.dsp.envelope import Envelope
+from nzsci.dsp.streaming import StreamingFilter
+from nzsci.fileio import txtfile
+
+
+class Stage:
+    """
+    Base class of the pipeline stages. setup() is called before the first block with the shape of the input,
+    process() filters the next (n_samples, n_channels) block and offline() a whole recording. Stages whose channels
+    are independent (channel_wise) may be run on groups of channels by different workers.
+    """
+
+    channel_wise = True
+
+    def setup(self, n_channels, sampling_rate):
+        """
+        Prepare the stage for a new signal.
+
+        :param int n_channels: number of channels of the input
+        :param float sampling_rate: sampling rate of the input (Hz)
+        :return: sampling rate of the output (Hz)
+        :rtype: float
+        """
+        return sampling_rate
+
+    def process(self, block):
+        """
+        Process the next block.
+
+        :param numpy.array block: samples, shape (n_samples, n_channels)
+        :return: processed samples
+        :rtype: numpy.array
+        """
+        return block
+
+    def offline(self, data):
+        """
+        Process a whole recording, by default as a single block.
+
+        :param numpy.array data: samples, shape (n_samples, n_channels)
+        :return: processed samples
+        :rtype: numpy.array
+        """
+        return self.process(data)
+
+    def close(self):
+        """
+        Release the resources of the stage at the end of a signal.
+        """
+        return
+
+
+class Filter(Stage):
+    """
+    IIR filter (see StreamingFilter), or a zero-phase forward-backward filter (like scipy.signal.filtfilt) which is
+    only available offline
+    """
+
+    def __init__(self, b=None, a=None, sos=None, zi=None, zero_phase=False):
+        """
+        Constructor. Either (b, a) or sos should be given.
+
+        :param list b: numerator coefficients (direct form)
+        :param list a: denominator coefficients (direct form)
+        :param numpy.array sos: second-order sections, shape (n_sections, 6)
+        :param zi: initial state, see StreamingFilter
+        :param bool zero_phase: filter forward and backward
+        :raise ValueError: If neither (b, a) nor sos is given
+        """
+        if sos is None:
+            if b is None or a is None:
+                raise ValueError('Either (b, a) or sos is required.')
+            sos = signal.tf2sos(b, a)
+        self.sos = np.asarray(sos, dtype=float)
+        self.zi = zi
+        self.zero_phase = zero_phase
+        self._filter = None
+        return
+
+    def setup(self, n_channels, sampling_rate):
+        self._filter = StreamingFilter(sos=self.sos, n_channels=n_channels, zi=self.zi)
+        return sampling_rate
+
+    def process(self, block):
+        if self.zero_phase:
+            raise ValueError('A zero-phase filter needs the whole signal, it cannot run in streaming mode.')
+        return self._filter.process(block)
+
+    def offline(self, data):
+        if self.zero_phase:
+            return signal.sosfiltfilt(self.sos, data, axis=0)
+        return self._filter.process(data)
+
+
+class Rectify(Stage):
+    """
+    Absolute value of the signal
+    """
+
+    def process(self, block):
+        return np.abs(block)
+
+
+class Smooth(Stage):
+    """
+    Moving average, moving RMS or exponential smoothing (see Envelope), the signal is not rectified
+    """
+
+    def __init__(self, window=100, method='mean', alpha=None):
+        """
+        Constructor.
+
+        :param int window: number of samples of the moving window
+        :param str method: 'mean', 'rms' or 'exponential'
+        :param float alpha: smoothing factor of the exponential moving average, defaults to 2 / (window + 1)
+        """
+        self.window = window
+        self.method = method
+        self.alpha = alpha
+        self._envelope = None
+        return
+
+    def setup(self, n_channels, sampling_rate):
+        self._envelope = Envelope(self.window, self.method, alpha=self.alpha, n_channels=n_channels, rectify=False)
+        return sampling_rate
+
+    def process(self, block):
+        return self._envelope.process(block)
+
+
+class Decimate(Stage):
+    """
+    Keep one sample out of factor, whatever the block boundaries. No anti-aliasing filter is applied, put a
+    low-pass Filter stage before when needed
+    """
+
+    def __init__(self, factor):
+        """
+        Constructor.
+
+        :param int factor: decimation factor
+        """
+        self.factor = int(factor)
+        self._phase = 0
+        return
+
+    def setup(self, n_channels, sampling_rate):
+        self._phase = 0
+        return sampling_rate / self.factor
+
+    def process(self, block):
+        out = block[self._phase::self.factor]
+        self._phase = (self._phase - block.shape[0]) % self.factor
+        return out
+
+
+class Write(Stage):
+    """
+    Write the signal into a .txt file (see fileio.txtfile.save_txt) and pass it on unchanged
+    """
+
+    channel_wise = False
+
+    def __init__(self, filename, fmt='%s', delimiter='  ', header=True, compression=None, compresslevel=1):
+        """
+        Constructor.
+
+        :param str filename: file name, an existing file is overwritten
+        :param str fmt: format of one value, e.g. '%.6g'
+        :param str delimiter: delimiter between columns
+        :param bool header: write the sampling rate on the first line
+        :param str compression: 'gzip', 'bz2', 'lzma' or None (guess from the file name)
+        :param int compresslevel: compression level
+        """
+        self.filename = filename
+        self.fmt = fmt
+        self.delimiter = delimiter
+        self.header = header
+        self.compression = compression
+        self.compresslevel = compresslevel
+        self._file = None
+        return
+
+    def setup(self, n_channels, sampling_rate):
+        self.close()
+        self._file = txtfile.open_txt(self.filename, 'w', compression=self.compression,
+                                      compresslevel=self.compresslevel)
+        if self.header:
+            self._file.write(str(sampling_rate) + '\n')
+        return sampling_rate
+
+    def process(self, block):
+        txtfile.write_rows(self._file, block, fmt=self.fmt, delimiter=self.delimiter)
+        return block
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_file'] = None
+        return state
+
+
+class Pipeline:
+    """
+    Chain of stages. run() processes a whole recording, optionally with groups of channels spread over a pool of
+    workers; start(), process() and close(), or stream(), process it block by block.
+    """
+
+    def __init__(self, stages, executor='serial', n_workers=None):
+        """
+        Constructor.
+
+        :param list stages: stages, applied in order
+        :param executor: how run() spreads channels: 'serial', 'thread', 'process' or a concurrent.futures.Executor
+        :param int n_workers: number of groups of channels (and of workers created by the pipeline), defaults to the
+                              number of CPUs
+        :raise ValueError: If the executor is unknown
+        """
+        if not isinstance(executor, concurrent.futures.Executor) and executor not in ('serial', 'thread', 'process'):
+            raise ValueError('Unknown executor: ' + str(executor))
+        self.stages = list(stages)
+        self.sampling_rate = None
+        self._executor = executor
+        self._n_workers = n_workers
+        return
+
+    def start(self, n_channels, sampling_rate):
+        """
+        Prepare all stages for a new signal.
+
+        :param int n_channels: number of channels of the input
+        :param float sampling_rate: sampling rate of the input (Hz)
+        :return: sampling rate of the output (Hz)
+        :rtype: float
+        """
+        for stage in self.stages:
+            sampling_rate = stage.setup(n_channels, sampling_rate)
+        self.sampling_rate = sampling_rate
+        return sampling_rate
+
+    def process(self, block):
+        """
+        Process the next block in streaming mode, after start().
+
+        :param numpy.array block: samples, shape (n_samples, n_channels), or (n_samples,) for a single channel
+        :return: processed samples, 2-D
+        :rtype: numpy.array
+        """
+        block = np.asarray(block, dtype=float)
+        if block.ndim == 1:
+            block = block.reshape(-1, 1)
+        for stage in self.stages:
+            block = stage.process(block)
+        return block
+
+    def close(self):
+        """
+        Close all stages, e.g. the files of Write stages.
+        """
+        for stage in self.stages:
+            stage.close()
+        return
+
+    def stream(self, blocks, sampling_rate):
+        """
+        Process a sequence of blocks in streaming mode.
+
+        :param blocks: iterable of blocks of samples, shape (n_samples, n_channels)
+        :param float sampling_rate: sampling rate of the input (Hz)
+        :return: generator of processed blocks
+        """
+        started = False
+        try:
+            for block in blocks:
+                block = np.asarray(block, dtype=float)
+                if not started:
+                    self.start(1 if block.ndim == 1 else block.shape[1], sampling_rate)
+                    started = True
+                yield self.process(block)
+        finally:
+            self.close()
+
+    def run(self, data, sampling_rate):
+        """
+        Process a whole recording offline. The leading channel-wise stages run on groups of channels, in parallel
+        unless the executor is 'serial', the other stages (e.g. Write) on all channels at once.
+
+        :param numpy.array data: samples, shape (n_samples, n_channels), e.g. from fileio.txtfile.read_txt
+        :param float sampling_rate: sampling rate (Hz)
+        :return: processed samples, 2-D
+        :rtype: numpy.array
+        """
+        data = np.asarray(data, dtype=float)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        n_parallel = 0
+        while n_parallel < len(self.stages) and self.stages[n_parallel].channel_wise:
+            n_parallel += 1
+        n_groups = min(self._n_workers or os.cpu_count() or 1, data.shape[1])
+        if self._executor == 'serial' or n_groups < 2 or n_parallel == 0:
+            n_parallel = 0
+
+        try:
+            if n_parallel:
+                groups = np.array_split(np.arange(data.shape[1]), n_groups)
+                stages = self.stages[:n_parallel]
+                with self._pool(n_groups) as pool:
+                    futures = [pool.submit(_run_stages, copy.deepcopy(stages), data[:, group], sampling_rate)
+                               for group in groups]
+                    results = [future.result() for future in futures]
+                data = np.concatenate([out for out, _ in results], axis=1)
+                sampling_rate = results[0][1]
+            for stage in self.stages[n_parallel:]:
+                sampling_rate = stage.setup(data.shape[1], sampling_rate)
+                data = stage.offline(data)
+            self.sampling_rate = sampling_rate
+        finally:
+            self.close()
+        return data
+
+    def run_file(self, filename, sampling_rate=0, chunk_size=None, dtype=float, columns=None):
+        """
+        Process a .txt file (see fileio.txtfile.read_txt), at once or chunk by chunk in streaming mode.
+
+        :param str filename: file name
+        :param float sampling_rate: sampling rate (Hz), 0 to read it from the header line of the file
+        :param int chunk_size: number of samples read at once, None to process the whole file offline
+        :param dtype: data type of the samples
+        :param list columns: indexes of the channels to read, None for all
+        :return: processed samples, 2-D
+        :rtype: numpy.array
+        """
+        if chunk_size is None:
+            data, hdr = txtfile.read_txt(filename, sampling_rate, dtype=dtype, columns=columns)
+            return self.run(data, hdr['sampling_rate'])
+        chunks = txtfile.iter_txt(filename, chunk_size, sampling_rate=sampling_rate, dtype=dtype, columns=columns)
+        first, hdr = next(chunks)
+        out = list(self.stream(_chain(first, chunks), hdr['sampling_rate']))
+        return np.concatenate(out) if out else np.zeros((0, 0))
+
+    def _pool(self, n_groups):
+        if isinstance(self._executor, concurrent.futures.Executor):
+            return contextlib.nullcontext(self._executor)
+        if self._executor == 'thread':
+            return concurrent.futures.ThreadPoolExecutor(max_workers=n_groups)
+        return concurrent.futures.ProcessPoolExecutor(max_workers=n_groups)
+
+
+def _chain(first, chunks):
+    yield first
+    for chunk, _ in chunks:
+        yield chunk
+
+
+def _run_stages(stages, data, sampling_rate):
+    # worker: run channel-wise stages offline on a group of channels
+    for stage in stages:
+        sampling_rate = stage.setup(data.shape[1], sampling_rate)
+        data = stage.offline(data)
+    for stage in stages:
+        stage.close()
+    return data, sampling_rate
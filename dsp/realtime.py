@@ -0,0 +1,315 @@
+"""
+asyncio real-time runner: blocks from a source (file replay or socket/pipe) go through a pipeline of stateful stages
+and are published to sinks, every step linked by a bounded queue.
+"""
+
+
+import asyncio
+import inspect
+import time
+import numpy as np
+from nzsci.fileio import txtfile
+
+
+OVERFLOWS = ('block', 'drop')
+
+
+class FileReplaySource:
+    """
+    Replay a recording block by block, each block is released when its last sample would have been acquired
+    """
+
+    def __init__(self, data, sampling_rate, block_size, speed=1.0):
+        """
+        Constructor.
+
+        :param numpy.array data: samples, shape (n_samples, n_channels) or (n_samples,)
+        :param float sampling_rate: sampling rate (Hz)
+        :param int block_size: number of samples per block
+        :param float speed: replay speed, 1 for real time, None to replay as fast as possible
+        """
+        data = np.asarray(data, dtype=float)
+        self.data = data.reshape(-1, 1) if data.ndim == 1 else data
+        self.sampling_rate = sampling_rate
+        self.n_channels = self.data.shape[1]
+        self.block_size = block_size
+        self.speed = speed
+        return
+
+    @classmethod
+    def from_txt(cls, filename, block_size, sampling_rate=0, speed=1.0, columns=None):
+        """
+        Replay a .txt file, see fileio.txtfile.read_txt.
+
+        :param str filename: file name
+        :param int block_size: number of samples per block
+        :param float sampling_rate: sampling rate (Hz), 0 to read it from the header line of the file
+        :param float speed: replay speed, 1 for real time, None to replay as fast as possible
+        :param list columns: indexes of the channels to read, None for all
+        :return: source
+        :rtype: FileReplaySource
+        """
+        data, hdr = txtfile.read_txt(filename, sampling_rate, columns=columns)
+        return cls(data, hdr['sampling_rate'], block_size, speed=speed)
+
+    async def blocks(self):
+        """
+        Blocks of the recording.
+
+        :return: asynchronous generator of (acquisition time (time.perf_counter), block)
+        """
+        start = time.perf_counter()
+        for i in range(0, self.data.shape[0], self.block_size):
+            block = self.data[i:i + self.block_size]
+            if self.speed:
+                due = start + (i + block.shape[0]) / self.sampling_rate / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                yield due, block
+            else:
+                yield time.perf_counter(), block
+
+
+class StreamSource:
+    """
+    Blocks read from a socket or a pipe (asyncio.StreamReader): each block is block_size rows of n_channels binary
+    values, see send_blocks
+    """
+
+    def __init__(self, reader, n_channels, sampling_rate, block_size, dtype='<f8', writer=None):
+        """
+        Constructor.
+
+        :param asyncio.StreamReader reader: stream
+        :param int n_channels: number of channels
+        :param float sampling_rate: sampling rate (Hz)
+        :param int block_size: number of samples per block
+        :param dtype: data type of the values on the stream
+        :param asyncio.StreamWriter writer: other end of a connection, kept open while reading and closed at the end
+        """
+        self.reader = reader
+        self.writer = writer
+        self.n_channels = n_channels
+        self.sampling_rate = sampling_rate
+        self.block_size = block_size
+        self.dtype = np.dtype(dtype)
+        return
+
+    @classmethod
+    async def connect(cls, host, port, n_channels, sampling_rate, block_size, dtype='<f8'):
+        """
+        Source reading from a TCP connection.
+
+        :param str host: host name
+        :param int port: port
+        :param int n_channels: number of channels
+        :param float sampling_rate: sampling rate (Hz)
+        :param int block_size: number of samples per block
+        :param dtype: data type of the values on the stream
+        :return: source
+        :rtype: StreamSource
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, n_channels, sampling_rate, block_size, dtype=dtype, writer=writer)
+
+    async def blocks(self):
+        """
+        Blocks read until the end of the stream, an incomplete last block is dropped.
+
+        :return: asynchronous generator of (acquisition time (time.perf_counter), block)
+        """
+        n_bytes = self.block_size * self.n_channels * self.dtype.itemsize
+        try:
+            while True:
+                try:
+                    raw = await self.reader.readexactly(n_bytes)
+                except asyncio.IncompleteReadError:
+                    return
+                yield time.perf_counter(), np.frombuffer(raw, dtype=self.dtype).reshape(-1, self.n_channels)
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+
+async def send_blocks(writer, data, block_size, dtype='<f8', sampling_rate=None):
+    """
+    Write a recording to a stream in the format of StreamSource, e.g. to stand in for an acquisition device.
+
+    :param asyncio.StreamWriter writer: stream, closed at the end
+    :param numpy.array data: samples, shape (n_samples, n_channels)
+    :param int block_size: number of samples per block
+    :param dtype: data type of the values on the stream
+    :param float sampling_rate: sampling rate (Hz) to pace the blocks at, None to send them as fast as possible
+    """
+    data = np.asarray(data, dtype=dtype)
+    start = time.perf_counter()
+    for i in range(0, data.shape[0], block_size):
+        if sampling_rate:
+            delay = start + i / sampling_rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        writer.write(data[i:i + block_size].tobytes())
+        await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+class Collector:
+    """
+    Sink keeping every block in memory
+    """
+
+    def __init__(self):
+        self.blocks = []
+        return
+
+    def __call__(self, block):
+        self.blocks.append(block)
+        return
+
+    def data(self):
+        """
+        Blocks received so far, as one array
+
+        :return: samples
+        :rtype: numpy.array
+        """
+        return np.concatenate(self.blocks) if self.blocks else np.zeros((0, 0))
+
+
+def _latency_stats(latencies, dropped):
+    stats = {'n_blocks': len(latencies), 'dropped': dropped}
+    if latencies:
+        stats['latency_p50'], stats['latency_p99'] = np.percentile(latencies, [50, 99]).tolist()
+        stats['latency_max'] = max(latencies)
+    return stats
+
+
+class RealtimeRunner:
+    """
+    Run a pipeline on the blocks of a source and publish the results to sinks. The source, the pipeline and every
+    sink are separate tasks linked by bounded queues: when a consumer is too slow, its producer either waits
+    (overflow='block', the backpressure reaches the source) or the oldest queued block is dropped and counted
+    (overflow='drop', latency stays bounded).
+    """
+
+    def __init__(self, source, pipeline, sinks=(), queue_size=8, overflow='block'):
+        """
+        Constructor.
+
+        :param source: FileReplaySource, StreamSource or any object with n_channels, sampling_rate and an asynchronous
+                       blocks() generator of (acquisition time, block)
+        :param nzsci.dsp.pipeline.Pipeline pipeline: stages applied to every block
+        :param list sinks: callables (or coroutine functions) called with every processed block
+        :param int queue_size: maximum number of blocks waiting in each queue
+        :param str overflow: 'block' or 'drop'
+        :raise ValueError: If overflow is unknown
+        """
+        if overflow not in OVERFLOWS:
+            raise ValueError('Unknown overflow policy: ' + str(overflow))
+        self.source = source
+        self.pipeline = pipeline
+        self.sinks = list(sinks)
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self._latencies = []
+        self._dropped = 0
+        self._sink_latencies = [[] for _ in self.sinks]
+        self._sink_dropped = [0] * len(self.sinks)
+        return
+
+    async def _offer(self, queue, item):
+        # put an item, return True if an older one was dropped to make room
+        if self.overflow == 'block':
+            await queue.put(item)
+            return False
+        dropped = False
+        if queue.full():
+            queue.get_nowait()
+            dropped = True
+        queue.put_nowait(item)
+        await asyncio.sleep(0)  # never starve the consumer
+        return dropped
+
+    async def _produce(self, queue):
+        try:
+            async for item in self.source.blocks():
+                self._dropped += await self._offer(queue, item)
+        finally:
+            await queue.put(None)
+
+    async def _process(self, queue, sink_queues):
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            timestamp, block = item
+            out = self.pipeline.process(block)
+            self._latencies.append(time.perf_counter() - timestamp)
+            for i, sink_queue in enumerate(sink_queues):
+                self._sink_dropped[i] += await self._offer(sink_queue, (timestamp, out))
+            await asyncio.sleep(0)  # let the sinks run between blocks
+        for sink_queue in sink_queues:
+            await sink_queue.put(None)
+
+    async def _publish(self, i, queue):
+        sink = self.sinks[i]
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            timestamp, block = item
+            result = sink(block)
+            if inspect.isawaitable(result):
+                await result
+            self._sink_latencies[i].append(time.perf_counter() - timestamp)
+
+    async def run(self):
+        """
+        Process the source until its end.
+
+        :return: statistics, see stats()
+        :rtype: dict
+        """
+        self._latencies = []
+        self._dropped = 0
+        self._sink_latencies = [[] for _ in self.sinks]
+        self._sink_dropped = [0] * len(self.sinks)
+        queue = asyncio.Queue(self.queue_size)
+        sink_queues = [asyncio.Queue(self.queue_size) for _ in self.sinks]
+        self.pipeline.start(self.source.n_channels, self.source.sampling_rate)
+        try:
+            await asyncio.gather(self._produce(queue), self._process(queue, sink_queues),
+                                 *[self._publish(i, sink_queue) for i, sink_queue in enumerate(sink_queues)])
+        finally:
+            self.pipeline.close()
+        return self.stats()
+
+    def stats(self):
+        """
+        Statistics of the last run: number of processed blocks, dropped blocks, p50/p99/max latency (s) from the
+        acquisition of a block to the end of its processing, and the same for each sink up to its publication.
+
+        :return: statistics ('n_blocks', 'dropped', 'latency_p50', 'latency_p99', 'latency_max', 'sinks')
+        :rtype: dict
+        """
+        stats = _latency_stats(self._latencies, self._dropped)
+        stats['sinks'] = [_latency_stats(latencies, dropped)
+                          for latencies, dropped in zip(self._sink_latencies, self._sink_dropped)]
+        return stats
+
+
+def run_realtime(source, pipeline, sinks=(), queue_size=8, overflow='block'):
+    """
+    Run a RealtimeRunner in a new event loop.
+
+    :param source: source of blocks, see RealtimeRunner
+    :param nzsci.dsp.pipeline.Pipeline pipeline: stages applied to every block
+    :param list sinks: callables (or coroutine functions) called with every processed block
+    :param int queue_size: maximum number of blocks waiting in each queue
+    :param str overflow: 'block' or 'drop'
+    :return: statistics, see RealtimeRunner.stats
+    :rtype: dict
+    """
+    return asyncio.run(RealtimeRunner(source, pipeline, sinks, queue_size=queue_size, overflow=overflow).run())
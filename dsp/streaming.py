@@ -0,0 +1,125 @@
+"""
+Stateful filters for block by block (streaming) signal processing.
+"""
+
+
+import numpy as np
+from scipy import signal
+
+
+class StreamingFilter:
+    """
+    IIR filter keeping its state between calls: a signal processed block by block, whatever the block sizes, gives
+    the same output as the whole signal filtered at once. The filter runs as second-order sections, which is
+    numerically robust for high orders and narrow bands, and filters all channels of a block in one call.
+    """
+
+    def __init__(self, b=None, a=None, sos=None, n_channels=1, zi=None):
+        """
+        Constructor. Either (b, a) or sos should be given.
+
+        :param list b: numerator coefficients (direct form), converted to second-order sections
+        :param list a: denominator coefficients (direct form)
+        :param numpy.array sos: second-order sections, shape (n_sections, 6), see scipy.signal.sosfilt
+        :param int n_channels: number of channels (columns) of the blocks
+        :param zi: initial state, None for a zero state, 'steady' for the steady state of a unit step input (the
+                   state scipy.signal.lfilter_zi gives to lfilter), a number x0 for the steady state of a constant
+                   input x0, or an array of second-order sections states, shape (n_sections, 2) or
+                   (n_sections, 2, n_channels)
+        :raise ValueError: If neither (b, a) nor sos is given
+        """
+        if sos is None:
+            if b is None or a is None:
+                raise ValueError('Either (b, a) or sos is required.')
+            sos = signal.tf2sos(b, a)
+        self.sos = np.asarray(sos, dtype=float)
+        self.n_channels = n_channels
+        self._coefficients = [tuple(section) for section in self.sos.tolist()]
+        self._zi = None
+        self._sample_zi = None
+        self.reset(zi)
+        return
+
+    def reset(self, zi=None):
+        """
+        Reset the filter state.
+
+        :param zi: initial state, same values as for the constructor
+        :raise ValueError: If zi is an unknown string
+        """
+        n_sections = self.sos.shape[0]
+        if zi is None:
+            state = np.zeros((n_sections, 2))
+        elif isinstance(zi, str):
+            if zi != 'steady':
+                raise ValueError('Unknown initial state: ' + zi)
+            state = signal.sosfilt_zi(self.sos)
+        elif np.ndim(zi) == 0:
+            state = signal.sosfilt_zi(self.sos) * zi
+        else:
+            state = np.asarray(zi, dtype=float)
+        if state.ndim == 2:
+            state = np.repeat(state[:, :, None], self.n_channels, axis=2)
+        self._zi = state.copy()
+        self._sample_zi = None
+        return
+
+    def _block_state(self):
+        # state is held as nested lists while processing sample by sample
+        if self._sample_zi is not None:
+            self._zi = np.array(self._sample_zi, dtype=float).transpose(1, 2, 0)
+            self._sample_zi = None
+        return self._zi
+
+    @property
+    def state(self):
+        """
+        Current state of the second-order sections, shape (n_sections, 2, n_channels)
+        """
+        return self._block_state().copy()
+
+    def process(self, block):
+        """
+        Filter the next block of samples.
+
+        :param numpy.array block: samples, shape (n_samples, n_channels), or (n_samples,) for a single channel
+        :return: filtered samples, same shape as the block
+        :rtype: numpy.array
+        :raise ValueError: If the number of channels of the block is wrong
+        """
+        block = np.asarray(block, dtype=float)
+        vector = block.ndim == 1
+        if vector:
+            block = block.reshape(-1, 1)
+        if block.shape[1] != self.n_channels:
+            raise ValueError('Block should have %d channels.' % self.n_channels)
+        if block.shape[0] == 0:
+            return block[:, 0] if vector else block
+        out, self._zi = signal.sosfilt(self.sos, block, axis=0, zi=self._block_state())
+        return out[:, 0] if vector else out
+
+    def process_sample(self, sample):
+        """
+        Filter one sample. Each call costs about a microsecond per channel, while process() has a fixed overhead of
+        tens of microseconds, so this is the fast path for sample by sample real-time loops. Both can be mixed.
+
+        :param sample: the sample, a number for a single channel or one value per channel
+        :return: filtered sample, same shape as the input
+        :rtype: float or numpy.array
+        :raise ValueError: If the number of channels of the sample is wrong
+        """
+        scalar = np.ndim(sample) == 0
+        values = [float(sample)] if scalar else np.asarray(sample, dtype=float).ravel().tolist()
+        if len(values) != self.n_channels:
+            raise ValueError('Sample should have %d channels.' % self.n_channels)
+        if self._sample_zi is None:
+            self._sample_zi = self._zi.transpose(2, 0, 1).tolist()
+        out = []
+        for x, channel_zi in zip(values, self._sample_zi):
+            for (b0, b1, b2, _, a1, a2), zi in zip(self._coefficients, channel_zi):
+                y = b0 * x + zi[0]
+                zi[0] = b1 * x - a1 * y + zi[1]
+                zi[1] = b2 * x - a2 * y
+                x = y
+            out.append(x)
+        return out[0] if scalar else np.array(out)
@@ -1,3 +1,4 @@
-import nzsci.fileio.txtfile
+from nzsci._lazy import attach
 
-__all__ = ['txtfile']
+__all__ = ['binfile', 'txtfile']
+__getattr__, __dir__ = attach(__name__, __all__)
@@ -0,0 +1,165 @@
+"""
+Binary signal container, opened through numpy.memmap for zero-copy random access.
+
+Layout (little-endian):
+    - fixed header: magic b'NZSB', version, sampling rate, n_points, n_channels, dtype, length of channel names and
+      offset of the samples
+    - channel names as a JSON list
+    - samples as one contiguous C-order (n_points, n_channels) array, aligned on 64 bytes
+"""
+
+
+import json
+import os
+import struct
+import numpy as np
+from nzsci.fileio import txtfile
+
+
+MAGIC = b'NZSB'
+VERSION = 1
+_HEADER = struct.Struct('<4sHHdQQ8sII')
+_N_POINTS_OFFSET = 16  # n_points is rewritten in place by append_bin
+_ALIGNMENT = 64
+
+
+def save_bin(data, sampling_rate, filename, channel_names=None):
+    """
+    Save data matrix into a binary container, the file should not exist yet.
+
+    :param numpy.array data: data matrix, one column per channel, its dtype is kept (e.g. float32)
+    :param float sampling_rate: sampling rate
+    :param str filename: file name
+    :param list channel_names: one name per channel, defaults to 'ch0', 'ch1', ...
+    :raise ValueError: If the number of channel names doesn't match the data
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+    if channel_names is None:
+        channel_names = ['ch%d' % i for i in range(data.shape[1])]
+    if len(channel_names) != data.shape[1]:
+        raise ValueError('Number of channel names should equal the number of channels.')
+
+    dtype = data.dtype.newbyteorder('<')
+    names = json.dumps(list(channel_names)).encode('utf-8')
+    data_offset = -(-(_HEADER.size + len(names)) // _ALIGNMENT) * _ALIGNMENT
+    header = _HEADER.pack(MAGIC, VERSION, 0, float(sampling_rate), data.shape[0], data.shape[1],
+                          dtype.str.encode('ascii'), len(names), data_offset)
+
+    with open(filename, 'xb') as data_file:
+        data_file.write(header)
+        data_file.write(names)
+        data_file.write(b'\0' * (data_offset - len(header) - len(names)))
+        data_file.write(np.ascontiguousarray(data, dtype=dtype).tobytes())
+
+
+def read_bin_header(filename):
+    """
+    Read the header of a binary container.
+
+    :param str filename: file name
+    :return: header('sampling_rate', 'n_points', 'n_channels', 'dtype', 'channel_names', 'data_offset')
+    :rtype: dict
+    :raise ValueError: If the file is not a binary container
+    """
+    with open(filename, 'rb') as data_file:
+        fixed = data_file.read(_HEADER.size)
+        if len(fixed) < _HEADER.size or fixed[:4] != MAGIC:
+            raise ValueError(filename + ' is not a binary signal container.')
+        magic, version, _, sampling_rate, n_points, n_channels, dtype, names_length, data_offset = \
+            _HEADER.unpack(fixed)
+        if version > VERSION:
+            raise ValueError('Unsupported binary container version: ' + str(version))
+        channel_names = json.loads(data_file.read(names_length).decode('utf-8'))
+
+    return {'sampling_rate': sampling_rate, 'n_points': n_points, 'n_channels': n_channels,
+            'dtype': np.dtype(dtype.rstrip(b'\0').decode('ascii')), 'channel_names': channel_names,
+            'data_offset': data_offset}
+
+
+def open_bin(filename, mode='r'):
+    """
+    Open a binary container as a memory map, nothing is read until samples are accessed, so any time window
+    (e.g. data[start:stop]) is read without loading the whole file.
+
+    :param str filename: file name
+    :param str mode: 'r' read-only or 'r+' to modify samples in place
+    :return: data matrix (numpy.memmap), header('sampling_rate', 'n_points', 'n_channels', 'dtype', 'channel_names',
+             'data_offset')
+    :rtype: numpy.memmap, dict
+    """
+    hdr = read_bin_header(filename)
+    shape = (hdr['n_points'], hdr['n_channels'])
+    if hdr['n_points'] == 0:
+        return np.zeros(shape, dtype=hdr['dtype']), hdr
+    data = np.memmap(filename, dtype=hdr['dtype'], mode=mode, offset=hdr['data_offset'], shape=shape)
+    return data, hdr
+
+
+def read_bin(filename, start=0, stop=None):
+    """
+    Read a time window of a binary container into memory.
+
+    :param str filename: file name
+    :param int start: index of the first sample
+    :param int stop: index after the last sample, None for the end of the file
+    :return: data matrix, header('sampling_rate', 'n_points', 'n_channels', 'dtype', 'channel_names', 'data_offset'),
+             'n_points' is the one of the file
+    :rtype: numpy.array, dict
+    """
+    data, hdr = open_bin(filename)
+    window = np.array(data[start:stop])
+    del data
+    return window, hdr
+
+
+def append_bin(filename, data):
+    """
+    Append samples to a binary container, e.g. during live acquisition. Samples are written before the header is
+    updated, so a reader never sees samples that are not completely written.
+
+    :param str filename: file name
+    :param numpy.array data: data matrix, one column per channel
+    :return: number of samples of the file
+    :rtype: int
+    :raise ValueError: If the number of channels doesn't match the file
+    """
+    hdr = read_bin_header(filename)
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+    if data.shape[1] != hdr['n_channels']:
+        raise ValueError('Number of channels should equal the one of the file.')
+
+    n_points = hdr['n_points'] + data.shape[0]
+    with open(filename, 'r+b') as data_file:
+        data_file.seek(hdr['data_offset'] + hdr['n_points'] * hdr['n_channels'] * hdr['dtype'].itemsize)
+        data_file.write(np.ascontiguousarray(data, dtype=hdr['dtype']).tobytes())
+        data_file.flush()
+        os.fsync(data_file.fileno())
+        data_file.seek(_N_POINTS_OFFSET)
+        data_file.write(struct.pack('<Q', n_points))
+    return n_points
+
+
+def txt2bin(txt_filename, bin_filename, sampling_rate=0, chunk_size=1000000, dtype=float, channel_names=None):
+    """
+    Convert a txt file (see txtfile.read_txt) into a binary container, chunk by chunk so the txt file may be larger
+    than memory.
+
+    :param str txt_filename: name of the txt file
+    :param str bin_filename: name of the binary container, it should not exist yet
+    :param float sampling_rate: sampling rate (Hz), 0 to read it from the header line of the txt file
+    :param int chunk_size: number of samples converted at once
+    :param dtype: data type of the samples in the container, e.g. numpy.float32
+    :param list channel_names: one name per channel
+    :return: header of the binary container
+    :rtype: dict
+    """
+    for chunk, hdr in txtfile.iter_txt(txt_filename, chunk_size, sampling_rate=sampling_rate, dtype=dtype):
+        if hdr['offset'] == 0:
+            save_bin(chunk, hdr['sampling_rate'], bin_filename, channel_names=channel_names)
+        else:
+            append_bin(bin_filename, chunk)
+    return read_bin_header(bin_filename)
@@ -3,66 +3,167 @@ Functions for reading and write data.
 """
 
 
+import bz2
+import gzip
+import itertools
+import lzma
 import numpy as np
 
 
-def read_txt(filename, sampling_rate=0):
+_COMPRESSIONS = {'gzip': (gzip.open, b'\x1f\x8b', '.gz'),
+                 'bz2': (bz2.open, b'BZh', '.bz2'),
+                 'lzma': (lzma.open, b'\xfd7zXZ\x00', '.xz')}
+
+
+def open_txt(filename, mode='r', compression=None, compresslevel=None):
+    """
+    Open a txt file, compressed or not. When reading, gzip, bz2 and lzma (xz) files are detected from their first
+    bytes, when writing the compression is given or guessed from the extension (.gz, .bz2, .xz).
+
+    :param str filename: file name
+    :param str mode: 'r', 'w', 'x' or 'a' (text mode)
+    :param str compression: 'gzip', 'bz2', 'lzma' or None (detect or guess)
+    :param int compresslevel: compression level when writing (preset for lzma), None for the library default
+    :return: text file object
+    :rtype: file
+    :raise ValueError: If the compression is unknown
+    """
+    if compression is None:
+        if mode == 'r':
+            with open(filename, 'rb') as raw_file:
+                magic = raw_file.read(6)
+            compression = next((name for name, (_, prefix, _) in _COMPRESSIONS.items() if magic.startswith(prefix)),
+                               None)
+        else:
+            compression = next((name for name, (_, _, ext) in _COMPRESSIONS.items() if filename.endswith(ext)), None)
+    if compression is None:
+        return open(filename, mode)
+    if compression not in _COMPRESSIONS:
+        raise ValueError('Unknown compression: ' + str(compression))
+    kwargs = {}
+    if compresslevel is not None and mode != 'r':
+        kwargs = {'preset': compresslevel} if compression == 'lzma' else {'compresslevel': compresslevel}
+    return _COMPRESSIONS[compression][0](filename, mode + 't', **kwargs)
+
+
+def read_txt(filename, sampling_rate=0, dtype=float, columns=None):
     """
     Reading data from txt file, each column will be loaded as a signal.
     By default, header information will be read from the first line of input data file. The first line should contain
     [sampling rate, channels]. If your data file doesn't have header information in its first line, you need to give
     sampling_rate as input.
+    Data are parsed in bulk by numpy straight into the output array.
 
     :param str filename: filename of the data.
     :param float sampling_rate: sampling rate (Hz)
+    :param dtype: data type of the output, e.g. numpy.float32 to halve memory
+    :param list columns: indexes of the columns (channels) to load, None for all columns
     :return: data matrix, header('sampling_rate', 'n_points', 'n_channels')
     :rtype: numpy.array, dict
     """
-    with open(filename, 'r') as data_file:
-        lines = data_file.readlines()
-
-    if sampling_rate == 0:
-        hdr_line = lines[0]
-        hdr_line = hdr_line.split()
-
-        hdr = {'sampling_rate': float(hdr_line[0])}
-
-        del lines[0]
-    else:
-        hdr = {'sampling_rate': sampling_rate}
+    with open_txt(filename, 'r') as data_file:
+        if sampling_rate == 0:
+            hdr_line = data_file.readline()
+            hdr_line = hdr_line.split()
 
-    firstline = lines[0]
-    firstline = firstline.split()
+            hdr = {'sampling_rate': float(hdr_line[0])}
+        else:
+            hdr = {'sampling_rate': sampling_rate}
 
-    hdr['n_points'] = len(lines)
-    hdr['n_channels'] = len(firstline)
+        data = np.loadtxt(data_file, dtype=dtype, usecols=columns, ndmin=2)
 
-    data = np.zeros([hdr['n_points'], hdr['n_channels']])
-
-    for i in range(hdr['n_points']):
-        row = lines[i]
-        row = row.rstrip('\n')
-        row = row.split()
-        for j in range(hdr['n_channels']):
-            data[i, j] = float(row[j])
+    hdr['n_points'] = data.shape[0]
+    hdr['n_channels'] = data.shape[1]
 
     return data, hdr
 
 
-def save_txt(data, sampling_rate, filename):
+def iter_txt(filename, chunk_size, sampling_rate=0, overlap=0, start=0, dtype=float, columns=None):
+    """
+    Iterate over a txt file by chunks of samples, only one chunk is held in memory.
+    The header line is handled as in read_txt. Consecutive chunks share 'overlap' samples: each chunk repeats the
+    last samples of the previous one, e.g. to warm up a filter. Seeking to 'start' skips lines without parsing them.
+
+    :param str filename: filename of the data.
+    :param int chunk_size: number of samples of each chunk (the last one may be shorter)
+    :param float sampling_rate: sampling rate (Hz)
+    :param int overlap: number of samples shared by consecutive chunks, smaller than chunk_size
+    :param int start: index of the first sample to read
+    :param dtype: data type of the output, e.g. numpy.float32 to halve memory
+    :param list columns: indexes of the columns (channels) to load, None for all columns
+    :return: iterator of data chunk, header('sampling_rate', 'n_points', 'n_channels', 'offset'), 'n_points' is the
+             length of the chunk and 'offset' the index of its first sample in the file
+    :rtype: iterator
+    :raise ValueError: If overlap is not smaller than chunk_size
+    """
+    if not 0 <= overlap < chunk_size:
+        raise ValueError('Overlap should be smaller than chunk size.')
+
+    with open_txt(filename, 'r') as data_file:
+        if sampling_rate == 0:
+            hdr_line = data_file.readline()
+            hdr_line = hdr_line.split()
+            sampling_rate = float(hdr_line[0])
+
+        for _ in itertools.islice(data_file, start):
+            pass
+
+        offset = start
+        tail = None
+        while True:
+            n_new = chunk_size if tail is None else chunk_size - len(tail)
+            lines = list(itertools.islice(data_file, n_new))
+            if not lines:
+                break
+            chunk = np.loadtxt(lines, dtype=dtype, usecols=columns, ndmin=2)
+            if tail is not None:
+                chunk = np.concatenate([tail, chunk])
+            hdr = {'sampling_rate': sampling_rate, 'n_points': chunk.shape[0], 'n_channels': chunk.shape[1],
+                   'offset': offset}
+            yield chunk, hdr
+            if len(lines) < n_new:
+                break
+            tail = chunk[len(chunk) - overlap:].copy()
+            offset = offset + len(chunk) - overlap
+
+
+def write_rows(data_file, data, fmt='%s', delimiter='  ', chunk_size=100000):
+    """
+    Write a data matrix into an open text file, one line per row. Rows are formatted and written by chunks, one
+    string formatting and one write per chunk.
+
+    :param file data_file: text file object
+    :param numpy.array data: data matrix, a vector is written as one column
+    :param str fmt: format of one value, e.g. '%.6g', the default writes the shortest repr of each value
+    :param str delimiter: delimiter between columns
+    :param int chunk_size: number of rows formatted at once
+    """
+    data = np.asarray(data)
+    if data.shape[0] == 0:
+        return
+    data = data.reshape(data.shape[0], -1)
+    line_fmt = delimiter.join([fmt] * data.shape[1]) + '\n'
+    for start in range(0, data.shape[0], chunk_size):
+        chunk = data[start:start + chunk_size]
+        data_file.write((line_fmt * chunk.shape[0]) % tuple(chunk.ravel().tolist()))
+
+
+def save_txt(data, sampling_rate, filename, fmt='%s', delimiter='  ', chunk_size=100000, compression=None,
+             compresslevel=1):
     """
     Save data matrix into a .txt file. The first line will contain the sampling rate.
+    The file is compressed if compression is given or if the file name ends with .gz, .bz2 or .xz, read_txt and
+    iter_txt read it back transparently.
 
     :param numpy.array data: data matrix
     :param float sampling_rate: sampling rate
     :param str filename: file name
+    :param str fmt: format of one value, e.g. '%.6g', the default writes the shortest repr of each value
+    :param str delimiter: delimiter between columns
+    :param int chunk_size: number of rows formatted and written at once
+    :param str compression: 'gzip', 'bz2', 'lzma' or None (guess from the file name)
+    :param int compresslevel: compression level, the default favours speed over size
     """
-    shape = np.shape(data)
-
-    with open(filename, 'x') as data_file:
+    with open_txt(filename, 'x', compression=compression, compresslevel=compresslevel) as data_file:
         data_file.write(str(sampling_rate)+'\n')
-        for i in range(shape[0]):
-            for j in range(shape[1]):
-                data_file.write(str(data[i, j]))
-                data_file.write('  ')
-            data_file.write('\n')
+        write_rows(data_file, data, fmt=fmt, delimiter=delimiter, chunk_size=chunk_size)
@@ -1,3 +1,4 @@
-import nzsci.math.number
+from nzsci._lazy import attach
 
-__all__ = ['number']
+__all__ = ['discretizer', 'number', 'regression']
+__getattr__, __dir__ = attach(__name__, __all__)
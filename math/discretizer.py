@@ -0,0 +1,166 @@
+"""
+Discretization of continuous multi-dimensional states into bins, with the bins of pandas.cut, computed once and
+looked up with binary searches instead of being rebuilt for every value.
+"""
+
+
+import bisect
+import numpy
+
+
+def uniform_edges(low, high, n_bins, right=True):
+    """
+    Edges of equal-width bins as pandas.cut(x, n_bins) builds them from the range of x: the outer edge is moved by
+    0.1% of the range so that both extremes fall in a bin.
+
+    :param float low: minimum of the range
+    :param float high: maximum of the range
+    :param int n_bins: number of bins
+    :param bool right: bins include their right edge, (a, b], else their left one, [a, b)
+    :return: n_bins + 1 increasing edges
+    :rtype: numpy.ndarray
+    :raise ValueError: If there is no bin or the range is reversed
+    """
+    if n_bins < 1:
+        raise ValueError('Number of bins should be at least 1.')
+    if high < low:
+        raise ValueError('Range should be increasing.')
+    if low == high:
+        adjust = 0.001 * abs(low) if low != 0 else 0.001
+        return numpy.linspace(low - adjust, high + adjust, n_bins + 1)
+    edges = numpy.linspace(low, high, n_bins + 1)
+    adjust = (high - low) * 0.001
+    if right:
+        edges[0] -= adjust
+    else:
+        edges[-1] += adjust
+    return edges
+
+
+class Discretizer:
+    """
+    Bins of every dimension of a state, and their flat index (row-major, the last dimension changes fastest) as a
+    single state number. A value out of the bins of its dimension is in no bin (-1), or in the nearest one if clip.
+    """
+
+    def __init__(self, edges, right=True, clip=False):
+        """
+        Constructor.
+
+        :param list edges: edges of the bins of each dimension, increasing
+        :param bool right: bins include their right edge, (a, b], else their left one, [a, b)
+        :param bool clip: values out of the bins go to the first or last bin instead of -1
+        :raise ValueError: If a dimension has less than 2 edges
+        """
+        self.edges = [numpy.asarray(e, dtype=float) for e in edges]
+        if any(e.ndim != 1 or len(e) < 2 for e in self.edges):
+            raise ValueError('Every dimension should have at least 2 edges.')
+        self.right = right
+        self.clip = clip
+        self.shape = tuple(len(e) - 1 for e in self.edges)
+        self.n_states = int(numpy.prod(self.shape))
+        self._strides = numpy.array([int(numpy.prod(self.shape[i + 1:])) for i in range(len(self.shape))])
+        self._side = 'left' if right else 'right'
+        self._bisect = bisect.bisect_left if right else bisect.bisect_right
+        self._edge_lists = [e.tolist() for e in self.edges]
+        self._dims = list(zip(self._edge_lists, self.shape, self._strides.tolist()))
+        return
+
+    @classmethod
+    def uniform(cls, low, high, n_bins, right=True, clip=False):
+        """
+        Equal-width bins over a range per dimension, see uniform_edges.
+
+        :param low: minimum of each dimension (or one for all)
+        :param high: maximum of each dimension (or one for all)
+        :param n_bins: number of bins of each dimension (or one for all)
+        :param bool right: bins include their right edge
+        :param bool clip: values out of the bins go to the nearest bin
+        :return: discretizer
+        :rtype: Discretizer
+        """
+        low, high, n_bins = numpy.broadcast_arrays(numpy.atleast_1d(low), numpy.atleast_1d(high),
+                                                   numpy.atleast_1d(n_bins))
+        return cls([uniform_edges(lo, hi, int(n), right=right) for lo, hi, n in zip(low, high, n_bins)],
+                   right=right, clip=clip)
+
+    @classmethod
+    def from_data(cls, data, n_bins, right=True, clip=False):
+        """
+        Equal-width bins over the range of sample states, the bins of pandas.cut(data[:, i], n_bins).
+
+        :param numpy.ndarray data: states, shape (n_states, n_dimensions), or (n_states,) for one dimension
+        :param n_bins: number of bins of each dimension (or one for all)
+        :param bool right: bins include their right edge
+        :param bool clip: values out of the bins go to the nearest bin
+        :return: discretizer
+        :rtype: Discretizer
+        """
+        data = numpy.asarray(data, dtype=float)
+        data = data.reshape(len(data), -1)
+        return cls.uniform(data.min(axis=0), data.max(axis=0), n_bins, right=right, clip=clip)
+
+    def bins(self, states):
+        """
+        Bin of every dimension of states, vectorized.
+
+        :param numpy.ndarray states: states, shape (n_states, n_dimensions), (n_dimensions,) for one state or
+                                     (n_states,) for one dimension
+        :return: bins, same shape, -1 out of the bins unless clip
+        :rtype: numpy.ndarray
+        """
+        states = numpy.asarray(states, dtype=float)
+        flat = states.reshape(-1, len(self.edges))
+        bins = numpy.empty(flat.shape, dtype=numpy.int64)
+        for i, (edges, n) in enumerate(zip(self.edges, self.shape)):
+            column = numpy.searchsorted(edges, flat[:, i], side=self._side) - 1
+            if self.clip:
+                numpy.clip(column, 0, n - 1, out=column)
+            else:
+                column[(column < 0) | (column >= n)] = -1
+            bins[:, i] = column
+        return bins.reshape(states.shape)
+
+    def indices(self, states):
+        """
+        State index of states, vectorized.
+
+        :param numpy.ndarray states: states, shape (n_states, n_dimensions), or (n_states,) for one dimension
+        :return: state indices, -1 for states out of the bins unless clip
+        :rtype: numpy.ndarray
+        """
+        states = numpy.asarray(states, dtype=float)
+        bins = self.bins(states.reshape(-1, len(self.edges)))
+        indices = bins @ self._strides
+        indices[(bins < 0).any(axis=1)] = -1
+        return indices
+
+    def index(self, state):
+        """
+        State index of one state, without numpy overhead for the low latency of a control loop.
+
+        :param state: one value per dimension, or a number for one dimension
+        :return: state index, -1 if the state is out of the bins unless clip
+        :rtype: int
+        """
+        if len(self._dims) == 1 and not hasattr(state, '__len__'):
+            state = (state,)
+        index = 0
+        for value, (edges, n, stride) in zip(state, self._dims):
+            b = self._bisect(edges, value) - 1
+            if not 0 <= b < n:
+                if not self.clip:
+                    return -1
+                b = 0 if b < 0 else n - 1
+            index += b * stride
+        return index
+
+    def unravel(self, index):
+        """
+        Bins of every dimension of a state index, inverse of index.
+
+        :param int index: state index
+        :return: one bin per dimension
+        :rtype: tuple
+        """
+        return tuple(int(b) for b in numpy.unravel_index(index, self.shape))
@@ -3,6 +3,9 @@ Functions for handling numbers
 """
 
 
+import numpy
+
+
 def int2bin(n: int, n_bits: int = 0) -> str:
     """
     Convert decimal integer to binary
@@ -92,6 +95,72 @@ def gray2int(gray_code: str) -> int:
     return bin2int(bin_code)
 
 
+def _check_n_bits(n_bits: int):
+    if not 0 < n_bits <= 64:
+        raise ValueError('Number of bit should be between 1 and 64.')
+
+
+def unpack_bits(n, n_bits: int):
+    """
+    Convert an array of non-negative integers to a bit matrix, array counterpart of int2bin
+
+    :param numpy.ndarray n: integers
+    :param int n_bits: number of bits of each integer (up to 64)
+    :return: bits, shape n.shape + (n_bits,), most significant bit first
+    :rtype: numpy.ndarray
+    :raise ValueError: If the nBits is not enough to store the input numbers
+    """
+    _check_n_bits(n_bits)
+    n = numpy.asarray(n).astype(numpy.uint64)
+    if n_bits < 64 and numpy.any(n >> numpy.uint64(n_bits)):
+        raise ValueError('Number of bit is too small.')
+    shifts = numpy.arange(n_bits - 1, -1, -1, dtype=numpy.uint64)
+    return ((n[..., None] >> shifts) & numpy.uint64(1)).astype(numpy.uint8)
+
+
+def pack_bits(bits):
+    """
+    Convert a bit matrix to an array of integers, array counterpart of bin2int
+
+    :param numpy.ndarray bits: bits, most significant bit first along the last axis (up to 64 bits)
+    :return: integers, shape bits.shape[:-1]
+    :rtype: numpy.ndarray
+    """
+    bits = numpy.asarray(bits)
+    _check_n_bits(bits.shape[-1])
+    shifts = numpy.arange(bits.shape[-1] - 1, -1, -1, dtype=numpy.uint64)
+    return numpy.bitwise_or.reduce(bits.astype(numpy.uint64) << shifts, axis=-1)
+
+
+def int2gray_array(n):
+    """
+    Convert an array of non-negative integers to gray code, array counterpart of int2gray
+
+    :param numpy.ndarray n: integers (up to 64 bits)
+    :return: gray codes as integers, use unpack_bits to get their bits
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(n).astype(numpy.uint64)
+    return n ^ (n >> numpy.uint64(1))
+
+
+def gray2int_array(gray_code):
+    """
+    Convert an array of gray codes to integers, array counterpart of gray2int. The binary code is the prefix XOR of
+    the gray code bits, computed with log2(64) shifts
+
+    :param numpy.ndarray gray_code: gray codes as integers (up to 64 bits), use pack_bits to build them from bits
+    :return: integers
+    :rtype: numpy.ndarray
+    """
+    n = numpy.asarray(gray_code).astype(numpy.uint64)
+    shift = 1
+    while shift < 64:
+        n = n ^ (n >> numpy.uint64(shift))
+        shift = shift * 2
+    return n
+
+
 if __name__ == '__main__':
     print('1. int2bin:')
     print('int 7 equals to bin ' + str(int2bin(7, n_bits=4)))
@@ -105,4 +174,8 @@ if __name__ == '__main__':
     print('int 7 equals to gray code ' + str(int2gray(7, n_bits=4)))
     print('6. gray2int:')
     print('gray code 0100 equals to int ' + str(gray2int('0100')))
+    print('7. int2gray_array:')
+    print('int [7, 4] equal to gray code ' + str(unpack_bits(int2gray_array([7, 4]), n_bits=4).tolist()))
+    print('8. gray2int_array:')
+    print('gray code [0100, 0110] equal to int ' + str(gray2int_array(pack_bits([[0, 1, 0, 0], [0, 1, 1, 0]]))))
     print('Quick demo for number module:')
@@ -0,0 +1,264 @@
+"""
+Functions and classes for simple linear regression (slope and intercept of y = slope * x + intercept), ordinary least
+squares as sklearn.linear_model.LinearRegression, computed from running sufficient statistics.
+"""
+
+
+import numpy
+
+
+def linear_fit(x, y):
+    """
+    Least squares slope and intercept of a set of points.
+
+    :param x: abscissas
+    :param y: ordinates
+    :return: slope, intercept (slope 0 if all abscissas are equal)
+    :rtype: float, float
+    """
+    x = numpy.asarray(x, dtype=float).ravel()
+    y = numpy.asarray(y, dtype=float).ravel()
+    mean_x = x.mean()
+    mean_y = y.mean()
+    sxx = numpy.dot(x - mean_x, x - mean_x)
+    slope = numpy.dot(x - mean_x, y - mean_y) / sxx if sxx > 0 else 0.0
+    return float(slope), float(mean_y - slope * mean_x)
+
+
+class _Regression:
+    """
+    Running sufficient statistics of a linear regression: number of points, means and centered co-moments (Welford's
+    algorithm), which are numerically stable whatever the offset of the data
+    """
+
+    def __init__(self):
+        self.reset()
+        return
+
+    def reset(self):
+        """
+        Forget all points.
+        """
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+        return
+
+    def update(self, x, y):
+        """
+        Add a point.
+
+        :param float x: abscissa
+        :param float y: ordinate
+        """
+        self.n += 1
+        dx = x - self.mean_x
+        self.mean_x += dx / self.n
+        self.mean_y += (y - self.mean_y) / self.n
+        self.sxx += dx * (x - self.mean_x)
+        self.sxy += dx * (y - self.mean_y)
+        return
+
+    def update_batch(self, x, y):
+        """
+        Add many points at once, their statistics are computed with numpy and merged (Chan et al.).
+
+        :param x: abscissas
+        :param y: ordinates
+        """
+        x = numpy.asarray(x, dtype=float).ravel()
+        y = numpy.asarray(y, dtype=float).ravel()
+        if len(x) == 0:
+            return
+        n = len(x)
+        mean_x = float(x.mean())
+        mean_y = float(y.mean())
+        sxx = float(numpy.dot(x - mean_x, x - mean_x))
+        sxy = float(numpy.dot(x - mean_x, y - mean_y))
+        total = self.n + n
+        dx = mean_x - self.mean_x
+        dy = mean_y - self.mean_y
+        self.sxx += sxx + dx * dx * self.n * n / total
+        self.sxy += sxy + dx * dy * self.n * n / total
+        self.mean_x += dx * n / total
+        self.mean_y += dy * n / total
+        self.n = total
+        return
+
+    @property
+    def slope(self):
+        """
+        Slope of the least squares line, 0 while all abscissas are equal
+        """
+        return self.sxy / self.sxx if self.sxx > 0 else 0.0
+
+    @property
+    def intercept(self):
+        """
+        Intercept of the least squares line
+        """
+        return self.mean_y - self.slope * self.mean_x
+
+
+class OnlineRegression(_Regression):
+    """
+    Linear regression updated point by point in O(1), points can be added and removed
+    """
+
+    def remove(self, x, y):
+        """
+        Remove a point previously added.
+
+        :param float x: abscissa
+        :param float y: ordinate
+        """
+        if self.n <= 1:
+            self.reset()
+            return
+        self.n -= 1
+        mean_x = self.mean_x - (x - self.mean_x) / self.n
+        self.sxx -= (x - mean_x) * (x - self.mean_x)
+        self.sxy -= (x - mean_x) * (y - self.mean_y)
+        self.mean_x = mean_x
+        self.mean_y -= (y - self.mean_y) / self.n
+        return
+
+
+class SlidingRegression(OnlineRegression):
+    """
+    Linear regression over the last window points: each new point removes the oldest one. The statistics are
+    recomputed from the kept points every window updates so rounding errors don't accumulate
+    """
+
+    def __init__(self, window):
+        """
+        Constructor.
+
+        :param int window: number of points of the window
+        :raise ValueError: If the window is smaller than 2 points
+        """
+        if window < 2:
+            raise ValueError('Window should be at least 2 points.')
+        self.window = window
+        super().__init__()
+        return
+
+    def reset(self):
+        super().reset()
+        self._points = []
+        self._pos = 0
+        return
+
+    def update(self, x, y):
+        if len(self._points) < self.window:
+            self._points.append((x, y))
+            super().update(x, y)
+            return
+        old_x, old_y = self._points[self._pos]
+        self._points[self._pos] = (x, y)
+        self._pos = (self._pos + 1) % self.window
+        if self._pos == 0:
+            points = self._points
+            super().reset()
+            super().update_batch([p[0] for p in points], [p[1] for p in points])
+            return
+        self.remove(old_x, old_y)
+        super().update(x, y)
+        return
+
+    def update_batch(self, x, y):
+        x = numpy.asarray(x, dtype=float).ravel().tolist()
+        y = numpy.asarray(y, dtype=float).ravel().tolist()
+        for xi, yi in zip(x, y):
+            self.update(xi, yi)
+        return
+
+
+class ExponentialRegression(_Regression):
+    """
+    Linear regression with exponential forgetting: the weight of a point is multiplied by forgetting at every update,
+    so the fit follows slow changes of the relationship
+    """
+
+    def __init__(self, forgetting=None, half_life=None):
+        """
+        Constructor, give either forgetting or half_life.
+
+        :param float forgetting: forgetting factor, between 0 and 1 (e.g. 0.99)
+        :param float half_life: number of updates after which the weight of a point is halved
+        :raise ValueError: If neither or both are given, or the forgetting factor is not in (0, 1]
+        """
+        if (forgetting is None) == (half_life is None):
+            raise ValueError('Either forgetting or half_life is required.')
+        if half_life is not None:
+            forgetting = 0.5 ** (1.0 / half_life)
+        if not 0 < forgetting <= 1:
+            raise ValueError('Forgetting factor should be in (0, 1].')
+        self.forgetting = forgetting
+        super().__init__()
+        return
+
+    def reset(self):
+        super().reset()
+        self.weight = 0.0
+        return
+
+    def update(self, x, y):
+        self.n += 1
+        self.weight = self.forgetting * self.weight + 1.0
+        dx = x - self.mean_x
+        self.mean_x += dx / self.weight
+        self.mean_y += (y - self.mean_y) / self.weight
+        self.sxx = self.forgetting * self.sxx + dx * (x - self.mean_x)
+        self.sxy = self.forgetting * self.sxy + dx * (y - self.mean_y)
+        return
+
+    def update_batch(self, x, y):
+        x = numpy.asarray(x, dtype=float).ravel().tolist()
+        y = numpy.asarray(y, dtype=float).ravel().tolist()
+        for xi, yi in zip(x, y):
+            self.update(xi, yi)
+        return
+
+
+def sliding_regression(y, window, x=None, chunk_size=1024):
+    """
+    Slope and intercept of every window of consecutive points, in one vectorized pass of cumulative sums. The data are
+    centered chunk by chunk before summing, which keeps the cancellation errors of the cumulative sums small.
+
+    :param numpy.array y: ordinates, 1-D
+    :param int window: number of points of a window
+    :param numpy.array x: abscissas, None for the indexes 0, 1, 2...
+    :param int chunk_size: number of windows computed at once
+    :return: slopes, intercepts, one per window (len(y) - window + 1), window i starts at point i
+    :rtype: numpy.array, numpy.array
+    :raise ValueError: If the window is smaller than 2 points or longer than the data
+    """
+    y = numpy.asarray(y, dtype=float)
+    x = numpy.arange(len(y), dtype=float) if x is None else numpy.asarray(x, dtype=float)
+    if not 2 <= window <= len(y):
+        raise ValueError('Window should be between 2 points and the length of the data.')
+    n_windows = len(y) - window + 1
+    slopes = numpy.empty(n_windows)
+    intercepts = numpy.empty(n_windows)
+    step = max(chunk_size, window)
+    for start in range(0, n_windows, step):
+        stop = min(start + step, n_windows)
+        xs = x[start:stop + window - 1]
+        ys = y[start:stop + window - 1]
+        offset_x = xs.mean()
+        offset_y = ys.mean()
+        xs = xs - offset_x
+        ys = ys - offset_y
+        sums = numpy.zeros((len(xs) + 1, 4))
+        numpy.cumsum(numpy.column_stack((xs, ys, xs * xs, xs * ys)), axis=0, out=sums[1:])
+        sx, sy, sxx, sxy = (sums[window:] - sums[:-window]).T
+        sxx = sxx - sx * sx / window
+        sxy = sxy - sx * sy / window
+        positive = sxx > 0
+        slope = numpy.where(positive, sxy / numpy.where(positive, sxx, 1.0), 0.0)
+        slopes[start:stop] = slope
+        intercepts[start:stop] = sy / window + offset_y - slope * (sx / window + offset_x)
+    return slopes, intercepts
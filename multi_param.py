@@ -1,20 +1,21 @@
-import itertools
-import pandas as pd
 import numpy as np
+from nzsci.math.discretizer import Discretizer
+from nzsci.optimization.sweep import ParameterGrid
 # list(itertools.product(['A', 'B'], ['C', 'D'], ['E','F','G']))
 # 或者使用
-# 组合多组参数，生成唯一的index。
+# 组合多组参数，生成唯一的index。不生成全部组合，index 和组合直接互相换算
+# 大网格用 nzsci.optimization.sweep.Sweep 分块并行计算，可断点续算
 all_list = [['A', 'B'], ['C', 'D']]
-A = list(itertools.product(*all_list))
-print(A)
-B = pd.Series(A)
-print(B)
+grid = ParameterGrid(all_list)
+for i in range(len(grid)):
+    print(i, grid[i])
+print(grid.index(('B', 'C')))
 
-# 离散化连续数据
+# 离散化连续数据，分箱同 pd.cut(bp_extent, state_discrete_bins)，只建一次
 state_discrete_bins = 20
 bp = 0.1
 bp_extent = [0.05, bp, 0.26]
 state_space = np.arange(0, state_discrete_bins, 1)
-out = pd.cut(bp_extent, state_discrete_bins, labels=state_space)
-state = out[1]
-print(state)
\ No newline at end of file
+discretizer = Discretizer.from_data(bp_extent, state_discrete_bins)
+state = state_space[discretizer.index(bp)]
+print(state)
@@ -1,3 +1,5 @@
-import nzsci.optimization.genetic_algorithm
+from nzsci._lazy import attach
 
-__all__ = ['genetic_algorithm']
\ No newline at end of file
+__all__ = ['fitness_cache', 'genetic_algorithm', 'island_genetic_algorithm', 'metrics', 'numpy_genetic_algorithm',
+           'real_genetic_algorithm', 'stopping', 'sweep']
+__getattr__, __dir__ = attach(__name__, __all__)
@@ -0,0 +1,114 @@
+"""
+Fitness memoization for the genetic algorithm
+"""
+
+
+import collections
+import os
+import pickle
+
+
+class FitnessCache:
+    """
+    Bounded LRU cache of fitness values keyed by packed DNA bits, with hit/miss counters and optional persistence
+    """
+
+    def __init__(self, max_size: int, filename: str = None, signature=None):
+        """
+        Constructor. If filename exists, known fitness values are loaded from it.
+
+        :param int max_size: maximum number of cached individuals, the least recently used one is evicted first
+        :param str filename: file the cache is persisted to, None for an in-memory cache
+        :param signature: description of the problem (e.g. parameters' ranges), a persisted cache is only reused for
+                          the same signature
+        """
+        self.max_size = max_size
+        self.filename = filename
+        self.signature = signature
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+        return
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def hit_rate(self):
+        """
+        Fraction of lookups answered from the cache
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: bytes):
+        """
+        Look up a fitness value and count the hit or miss
+
+        :param bytes key: packed DNA bits
+        :return: fitness value, None if the individual is unknown
+        :rtype: float
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: bytes, value: float):
+        """
+        Store a fitness value, evicting the least recently used entries beyond max_size
+
+        :param bytes key: packed DNA bits
+        :param float value: fitness value
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return
+
+    def clear(self):
+        """
+        Remove all entries and reset the counters
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def save(self, filename: str = None):
+        """
+        Persist the cache, the file is replaced atomically
+
+        :param str filename: file name, defaults to the filename given to the constructor
+        """
+        filename = filename or self.filename
+        tmp_filename = filename + '.tmp'
+        with open(tmp_filename, 'wb') as cache_file:
+            pickle.dump({'signature': self.signature, 'entries': list(self._entries.items())}, cache_file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filename, filename)
+        return
+
+    def load(self, filename: str):
+        """
+        Load a persisted cache, most recently used entries are kept if it is larger than max_size
+
+        :param str filename: file name
+        :raise ValueError: If the file was saved for a different problem signature
+        """
+        with open(filename, 'rb') as cache_file:
+            content = pickle.load(cache_file)
+        if content['signature'] != self.signature:
+            raise ValueError('Fitness cache ' + filename + ' was saved for a different problem.')
+        for key, value in content['entries'][-self.max_size:]:
+            self.put(key, value)
+        return
@@ -1,8 +1,17 @@
+import concurrent.futures
+import contextlib
 import math
+import os
+import pickle
 import random
+import threading
+import time
 import numpy
-import progressbar
 import nzsci.math.number as number
+from nzsci.optimization.fitness_cache import FitnessCache
+
+
+PHASES = ('select', 'cross', 'mutation', 'decode', 'fitness', 'elitism')
 
 
 class GeneticAlgorithm:
@@ -11,7 +20,11 @@ class GeneticAlgorithm:
     """
 
     def __init__(self, max_gen: int, pop_generation: int, p_cross: float,
-                 p_mutation: float, n_genes: int, parameters_range: list, fitness_func):
+                 p_mutation: float, n_genes: int, parameters_range: list, fitness_func=None,
+                 batch_fitness_func=None, executor='serial', n_workers: int = None, chunk_size: int = None,
+                 cache_size: int = 0, cache_file: str = None, cache_key=None, checkpoint_file: str = None,
+                 checkpoint_every: int = 0, checkpoint_seconds: float = 0, stopping: list = None,
+                 rate_schedule=None, callbacks: list = None, progress: bool = True):
 
         """
         Constructor.
@@ -25,7 +38,35 @@ class GeneticAlgorithm:
                                       for integer parameters, just set accuracy as 1
         :param function fitness_func: refer to the fitness function, which should be a function that receive parameters
                                     as input and return fitness value
+        :param function batch_fitness_func: optional batched fitness function, which receive the parameters of the
+                                            whole population as a (n_pop, n_genes) array and return n_pop fitness
+                                            values, it is called once per generation instead of fitness_func
+        :param str or concurrent.futures.Executor executor: how fitness is evaluated, 'serial' (default), 'thread',
+                                                            'process' or a user-supplied Executor. For 'process' the
+                                                            fitness function must be picklable (module level)
+        :param int n_workers: number of workers of the 'thread'/'process' pool, None for the number of CPUs
+        :param int chunk_size: individuals sent to a worker per task, None for an even split between workers
+        :param int cache_size: maximum number of fitness values memoized by DNA (LRU eviction), 0 disables the cache
+        :param str cache_file: file the fitness cache is loaded from and saved to at the end of run()
+        :param cache_key: identifies the fitness function in the signature of the cache file, a cache file is only
+                          reused for the same parameters' ranges and key. None for the module and qualified name of
+                          the fitness function, set it when the function changes but keeps its name
+        :param str checkpoint_file: file the run is checkpointed to, see resume()
+        :param int checkpoint_every: write a checkpoint every N generations, 0 to disable
+        :param float checkpoint_seconds: write a checkpoint when T seconds passed since the last one, 0 to disable
+        :param list stopping: stopping criteria (see nzsci.optimization.stopping), the run stops before 'maxGen' as
+                              soon as one of them is met
+        :param function rate_schedule: called after every generation with this object, returns the (p_cross,
+                                       p_mutation) of the next generation, e.g. stopping.AdaptiveRates
+        :param list callbacks: functions called after every generation with the metrics dict of that generation
+                               (see metrics()), e.g. nzsci.optimization.metrics.MetricsHistory or MetricsLogger
+        :param bool progress: display a progressbar, set False to run headless (e.g. in batch jobs)
+        :raise ValueError: If neither fitness_func nor batch_fitness_func is given, or executor is unknown
         """
+        if fitness_func is None and batch_fitness_func is None:
+            raise ValueError('Either fitness_func or batch_fitness_func is required.')
+        if not isinstance(executor, concurrent.futures.Executor) and executor not in ('serial', 'thread', 'process'):
+            raise ValueError('Unknown executor: ' + str(executor))
         self._max_gen_num = max_gen
         self._pop_generation = pop_generation
         self._p_cross = p_cross
@@ -34,6 +75,38 @@ class GeneticAlgorithm:
         self._parameters_range = parameters_range
 
         self.fitness_func = fitness_func
+        self.batch_fitness_func = batch_fitness_func
+
+        self._executor = executor
+        self._n_workers = n_workers
+        self._chunk_size = chunk_size
+        self._pool = None
+
+        self.cache = None
+        if cache_size > 0:
+            if cache_key is None:
+                func = batch_fitness_func if batch_fitness_func is not None else fitness_func
+                cache_key = (getattr(func, '__module__', None),
+                             getattr(func, '__qualname__', type(func).__qualname__))
+            self.cache = FitnessCache(cache_size, filename=cache_file, signature=(repr(parameters_range), cache_key))
+
+        self._checkpoint_file = checkpoint_file
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_seconds = checkpoint_seconds
+        self._checkpoint_thread = None
+        self._checkpoint_error = None
+
+        self._stopping = stopping or []
+        self._rate_schedule = rate_schedule
+        self.stop_reason = None
+        self.n_evaluations = 0
+        self._generation_number = 0
+
+        self._callbacks = callbacks or []
+        self._progress = progress
+        self._timings = dict.fromkeys(PHASES, 0.0)
+        self._evaluations_before = 0
+        self._cache_counters_before = (0, 0)
 
         self._generation = []
         self._fitness_list = []
@@ -56,6 +129,34 @@ class GeneticAlgorithm:
         self._best_individual = list('-' * self._dna_length)
         return
 
+    @property
+    def best_fitness(self):
+        """
+        Best fitness found so far
+        """
+        return self._best_fitness
+
+    @property
+    def best_individual(self):
+        """
+        DNA of the best individual found so far
+        """
+        return self._best_individual
+
+    @property
+    def generation_number(self):
+        """
+        Number of the last finished generation
+        """
+        return self._generation_number
+
+    @property
+    def mean_fitness(self):
+        """
+        Mean fitness of the current generation
+        """
+        return numpy.mean(self._fitness_list)
+
     def info(self):
         """
         Display information of current object, includes:
@@ -114,6 +215,60 @@ class GeneticAlgorithm:
             parameters.append(parameter_i)
         return parameters
 
+    def decode_population(self, generation):
+        """
+        Decode DNA of a whole population to parameters in one vectorized gray to integer pass
+
+        :param list or numpy.ndarray generation: list of DNA sequences or a (n_pop, dna_length) array of bits
+        :return: parameters, one row for each individual
+        :rtype: numpy.ndarray
+        """
+        bits = self.population_bits(generation)
+        parameters = numpy.empty((bits.shape[0], self._n_genes))
+        for i in range(self._n_genes):
+            gene_sequence_gray = number.pack_bits(bits[:, self._dna_idx[i][0]:self._dna_idx[i][1] + 1])
+            gene_sequence_digit = number.gray2int_array(gene_sequence_gray).astype(float)
+            parameters[:, i] = \
+                gene_sequence_digit / (2 ** self._gene_length[i] - 1) \
+                * (self._parameters_range[i][1] - self._parameters_range[i][0]) \
+                + self._parameters_range[i][0]
+        return parameters
+
+    def population_bits(self, generation):
+        """
+        Convert a population to a bit matrix
+
+        :param list or numpy.ndarray generation: list of DNA sequences or a (n_pop, dna_length) array of bits
+        :return: bits, one row for each individual
+        :rtype: numpy.ndarray
+        """
+        bits = numpy.asarray(generation)
+        if bits.dtype.kind == 'U':
+            bits = bits == '1'
+        return bits.astype(numpy.uint8).reshape(-1, self._dna_length)
+
+    def population_keys(self, bits):
+        """
+        Keys of the fitness cache: packed DNA bits of each individual
+
+        :param numpy.ndarray bits: bits, one row for each individual
+        :return: keys
+        :rtype: list
+        """
+        return [row.tobytes() for row in numpy.packbits(bits, axis=1)]
+
+    def diversity(self):
+        """
+        Diversity of the current generation: mean over DNA positions of 4 * p * (1 - p), p being the fraction of
+        individuals having a 1 at that position. 0 means all individuals are identical, 1 means every position is
+        evenly split
+
+        :return: diversity, between 0 and 1
+        :rtype: float
+        """
+        p = self.population_bits(self._generation).mean(axis=0)
+        return float(numpy.mean(4 * p * (1 - p)))
+
     def random_dna(self):
         """
         Create random DNA for initially generation
@@ -175,17 +330,20 @@ class GeneticAlgorithm:
 
     def select(self):
         """
-        Select better individuals with a championships strategy
+        Select better individuals with a championships strategy, using the fitness already calculated for the current
+        generation
         """
         n_candidates = 2
         generation = []
+        fitness_list = []
         for i in range(self._pop_generation):
-            candidates = random.choices(self._generation, k=n_candidates)
-            fitness_list = self.fitness(candidates=candidates)
-            best_fitness = max(fitness_list)
-            idx = fitness_list.index(best_fitness)
-            generation.append(candidates[idx].copy())
+            candidates = random.choices(range(self._pop_generation), k=n_candidates)
+            candidates_fitness = [self._fitness_list[idx] for idx in candidates]
+            idx = candidates[candidates_fitness.index(max(candidates_fitness))]
+            generation.append(self._generation[idx].copy())
+            fitness_list.append(self._fitness_list[idx])
         self._generation = generation
+        self._fitness_list = fitness_list
         return
 
     def elitist_reservation(self):
@@ -204,6 +362,65 @@ class GeneticAlgorithm:
             self._fitness_list[idx] = self._best_fitness
         return
 
+    def evolve(self):
+        """
+        Evolve the current generation into the next one: select, cross, mutation, fitness and elitist preservation
+        """
+        self._timed('select', self.select)
+        self._timed('cross', self.cross)
+        self._timed('mutation', self.mutation)
+        self.fitness()
+        self._timed('elitism', self.elitist_reservation)
+        return
+
+    def _timed(self, phase, func, *args):
+        start = time.perf_counter()
+        ret = func(*args)
+        self._timings[phase] += time.perf_counter() - start
+        return ret
+
+    def _start_metrics(self):
+        self._timings = dict.fromkeys(PHASES, 0.0)
+        self._evaluations_before = self.n_evaluations
+        if self.cache is not None:
+            self._cache_counters_before = (self.cache.hits, self.cache.misses)
+        return
+
+    def metrics(self):
+        """
+        Metrics of the last generation:
+            - generation, best_fitness, mean_fitness, diversity, p_cross, p_mutation
+            - time_<phase>: seconds spent in each phase (select, cross, mutation, decode, fitness, elitism) and
+              time_total, fitness being the time of fitness_func
+            - n_evaluations: fitness evaluations, evaluations_per_second: evaluations over fitness time
+            - cache_hit_rate: hit rate of the fitness cache during the generation, nan without cache
+
+        :return: metrics
+        :rtype: dict
+        """
+        n_evaluations = self.n_evaluations - self._evaluations_before
+        cache_hit_rate = float('nan')
+        if self.cache is not None:
+            hits = self.cache.hits - self._cache_counters_before[0]
+            lookups = hits + self.cache.misses - self._cache_counters_before[1]
+            cache_hit_rate = hits / lookups if lookups else 0.0
+        metrics = {
+            'generation': self._generation_number,
+            'best_fitness': float(self._best_fitness),
+            'mean_fitness': float(numpy.mean(self._fitness_list)),
+            'diversity': self.diversity(),
+            'p_cross': self._p_cross,
+            'p_mutation': self._p_mutation
+        }
+        for phase in PHASES:
+            metrics['time_' + phase] = self._timings[phase]
+        metrics['time_total'] = sum(self._timings.values())
+        metrics['n_evaluations'] = n_evaluations
+        metrics['evaluations_per_second'] = \
+            n_evaluations / self._timings['fitness'] if self._timings['fitness'] > 0 else float('nan')
+        metrics['cache_hit_rate'] = cache_hit_rate
+        return metrics
+
     def fitness(self, candidates: str or list = 'None'):
         """
         Calculate fitness for input candidates or for all individuals of current generation (default)
@@ -212,44 +429,294 @@ class GeneticAlgorithm:
         :return: list of fitness
         :rtype: list
         """
-        if candidates == 'None':
-            self._fitness_list = []
-            for dna in self._generation:
-                parameters = self.decode(dna)
-                self._fitness_list.append(self.fitness_func(parameters))
+        if isinstance(candidates, str):
+            self._fitness_list = self.evaluate(self._generation)
             return
         else:
-            fitness_list = []
-            for dna in candidates:
-                parameters = self.decode(dna)
-                fitness_list.append(self.fitness_func(parameters))
-            return fitness_list
+            return self.evaluate(candidates)
+
+    def evaluate(self, generation):
+        """
+        Evaluate the fitness of a population. Individuals found in the fitness cache are not evaluated again,
+        duplicates inside the population are evaluated once
+
+        :param list or numpy.ndarray generation: list of DNA sequences or a (n_pop, dna_length) array of bits
+        :return: list of fitness
+        :rtype: list
+        """
+        if self.cache is None:
+            parameters = self._timed('decode', self.decode_population, generation)
+            return self._timed('fitness', self.evaluate_parameters, parameters)
+
+        start = time.perf_counter()
+        bits = self.population_bits(generation)
+        keys = self.population_keys(bits)
+        fitness_list = [None] * len(keys)
+        missing = {}
+        for i, key in enumerate(keys):
+            if key in missing:
+                self.cache.hits += 1
+                missing[key].append(i)
+                continue
+            fitness_list[i] = self.cache.get(key)
+            if fitness_list[i] is None:
+                missing[key] = [i]
+        self._timings['decode'] += time.perf_counter() - start
+        if missing:
+            idx = [positions[0] for positions in missing.values()]
+            parameters = self._timed('decode', self.decode_population, bits[idx])
+            for (key, positions), value in zip(missing.items(),
+                                               self._timed('fitness', self.evaluate_parameters, parameters)):
+                self.cache.put(key, value)
+                for i in positions:
+                    fitness_list[i] = value
+        return fitness_list
+
+    def evaluate_parameters(self, parameters):
+        """
+        Evaluate the fitness of decoded parameters: either call batch_fitness_func once or fitness_func once per
+        individual, serially or through the executor
+
+        :param numpy.ndarray parameters: parameters, one row for each individual
+        :return: list of fitness
+        :rtype: list
+        """
+        self.n_evaluations += len(parameters)
+        pool = self.pool()
+        if pool is None:
+            if self.batch_fitness_func is not None:
+                return numpy.asarray(self.batch_fitness_func(parameters), dtype=float).tolist()
+            return [self.fitness_func(p) for p in parameters.tolist()]
+
+        n_workers = self._n_workers or os.cpu_count() or 1
+        if self.batch_fitness_func is not None:
+            chunk_size = self._chunk_size or math.ceil(len(parameters) / n_workers)
+            chunks = [parameters[i:i + chunk_size] for i in range(0, len(parameters), chunk_size)]
+            fitness_list = pool.map(self.batch_fitness_func, chunks)
+            return numpy.concatenate([numpy.asarray(f, dtype=float).reshape(-1) for f in fitness_list]).tolist()
+        chunk_size = self._chunk_size or max(1, math.ceil(len(parameters) / (4 * n_workers)))
+        return list(pool.map(self.fitness_func, parameters.tolist(), chunksize=chunk_size))
+
+    def pool(self):
+        """
+        Executor used to evaluate fitness, it is created on first use and reused across generations
+
+        :return: executor, None for serial evaluation
+        :rtype: concurrent.futures.Executor
+        """
+        if self._pool is None:
+            if isinstance(self._executor, concurrent.futures.Executor):
+                self._pool = self._executor
+            elif self._executor == 'thread':
+                self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self._n_workers)
+            elif self._executor == 'process':
+                self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self._n_workers)
+        return self._pool
+
+    def close(self):
+        """
+        Shut down the executor created by this object, a user-supplied executor is left running
+        """
+        if self._pool is not None and self._pool is not self._executor:
+            self._pool.shutdown()
+        self._pool = None
+        return
+
+    def get_state(self):
+        """
+        Snapshot of the run state: population, fitness list, best individual and RNG state. DNA is stored as packed
+        bits and the snapshot shares no data with the running object
+
+        :return: state
+        :rtype: dict
+        """
+        return {
+            'dna_length': self._dna_length,
+            'generation': numpy.packbits(self.population_bits(self._generation), axis=1),
+            'fitness_list': numpy.array(self._fitness_list, dtype=float),
+            'best_fitness': float(self._best_fitness),
+            'best_individual': numpy.packbits(self.population_bits([self._best_individual])[0]),
+            'rng_state': random.getstate(),
+            'p_cross': self._p_cross,
+            'p_mutation': self._p_mutation,
+            'control_state': self._control_state()
+        }
+
+    def set_state(self, state: dict):
+        """
+        Restore a state created by get_state()
+
+        :param dict state: state
+        :raise ValueError: If the state was created for a different DNA length
+        """
+        if state['dna_length'] != self._dna_length:
+            raise ValueError('State was saved for a different DNA length.')
+        bits = numpy.unpackbits(state['generation'], axis=1, count=self._dna_length)
+        self._generation = bits.astype(str).tolist()
+        self._fitness_list = state['fitness_list'].tolist()
+        self._best_fitness = state['best_fitness']
+        best_individual = numpy.unpackbits(state['best_individual'], count=self._dna_length)
+        self._best_individual = best_individual.astype(str).tolist()
+        random.setstate(state['rng_state'])
+        self._p_cross = state['p_cross']
+        self._p_mutation = state['p_mutation']
+        self._set_control_state(state.get('control_state'))
+        return
+
+    def _control_state(self):
+        # state of the stopping criteria and of the rate schedule, None for objects without get_state()
+        return {'stopping': [c.get_state() if hasattr(c, 'get_state') else None for c in self._stopping],
+                'rate_schedule': self._rate_schedule.get_state() if hasattr(self._rate_schedule, 'get_state')
+                else None}
+
+    def _set_control_state(self, state):
+        # criteria whose state was not saved start afresh
+        states = state['stopping'] if state is not None else [None] * len(self._stopping)
+        for criterion, criterion_state in zip(self._stopping, states):
+            if criterion_state is not None and hasattr(criterion, 'set_state'):
+                criterion.set_state(criterion_state)
+            elif hasattr(criterion, 'reset'):
+                criterion.reset()
+        if state is not None and state['rate_schedule'] is not None and hasattr(self._rate_schedule, 'set_state'):
+            self._rate_schedule.set_state(state['rate_schedule'])
+        return
+
+    def save_checkpoint(self, filename: str, generation_number: int, background: bool = False):
+        """
+        Write a checkpoint, the file is replaced atomically so an interrupted write never corrupts the previous one
+
+        :param str filename: file name
+        :param int generation_number: number of the last finished generation
+        :param bool background: serialize and write in a background thread, the state is snapshot before returning
+        :raise Exception: The error of the previous background write if it failed, or of this write
+        """
+        state = self.get_state()
+        state['generation_number'] = generation_number
+        self.wait_checkpoint()
+        if background:
+            self._checkpoint_thread = threading.Thread(target=self._write_checkpoint_background, args=(filename, state))
+            self._checkpoint_thread.start()
+        else:
+            _write_checkpoint(filename, state)
+        return
+
+    def _write_checkpoint_background(self, filename, state):
+        # the error is kept for wait_checkpoint(), an exception would only end the thread
+        try:
+            _write_checkpoint(filename, state)
+        except Exception as error:
+            self._checkpoint_error = error
+        return
+
+    def wait_checkpoint(self):
+        """
+        Wait for the checkpoint being written in background, if any
+
+        :raise Exception: The error of the background write if it failed
+        """
+        if self._checkpoint_thread is not None:
+            self._checkpoint_thread.join()
+            self._checkpoint_thread = None
+        error, self._checkpoint_error = self._checkpoint_error, None
+        if error is not None:
+            raise error
+        return
+
+    def load_checkpoint(self, filename: str):
+        """
+        Load a checkpoint written by save_checkpoint()
+
+        :param str filename: file name
+        :return: number of the last finished generation
+        :rtype: int
+        """
+        with open(filename, 'rb') as checkpoint_file:
+            state = pickle.load(checkpoint_file)
+        self.set_state(state)
+        return state['generation_number']
 
     def run(self):
         """
         Start main loop to iterate 'maxGen' generations to find the best individual
         """
-        self.ini_generation()
-        widgets = [
-            'Progress:',
-            progressbar.Percentage(),
-            '   ',
-            progressbar.Bar(),
-            progressbar.DynamicMessage('Best'),
-            '   ',
-            progressbar.DynamicMessage('Average')
-        ]
-        with progressbar.ProgressBar(max_value=self._max_gen_num + 1, widgets=widgets) as bar:
-            print('Genetic Algorithm is running:')
-            for i in range(1, self._max_gen_num + 1):
-                self.select()
-                self.cross()
-                self.mutation()
-                self.fitness()
-                self.elitist_reservation()
-                best_fitness = self._best_fitness
-                mean_fitness = numpy.mean(self._fitness_list)
-                bar.update(i, Best=best_fitness, Average=mean_fitness)
+        self._run()
+        return
+
+    def resume(self, filename: str):
+        """
+        Continue a run from a checkpoint, the result is identical to an uninterrupted run. The object must be
+        constructed with the same parameters and fitness function as the checkpointed one
+
+        :param str filename: checkpoint file name
+        """
+        self._run(filename)
+        return
+
+    def _run(self, checkpoint: str = None):
+        bar = contextlib.nullcontext()
+        if self._progress:
+            import progressbar  # only loaded when a progress bar is displayed
+            widgets = [
+                'Progress:',
+                progressbar.Percentage(),
+                '   ',
+                progressbar.Bar(),
+                progressbar.DynamicMessage('Best'),
+                '   ',
+                progressbar.DynamicMessage('Average')
+            ]
+            bar = progressbar.ProgressBar(max_value=self._max_gen_num + 1, widgets=widgets)
+        self.stop_reason = None
+        if checkpoint is None:
+            # a resumed run restores the state of the criteria from the checkpoint instead
+            for criterion in self._stopping:
+                if hasattr(criterion, 'reset'):
+                    criterion.reset()
+        try:
+            self._start_metrics()
+            if checkpoint is None:
+                self.ini_generation()
+                start = 1
+            else:
+                start = self.load_checkpoint(checkpoint) + 1
+            self._generation_number = start - 1
+            if checkpoint is None:
+                self._callback()
+            checkpoint_time = time.monotonic()
+            with bar:
+                if self._progress:
+                    print('Genetic Algorithm is running:')
+                for i in range(start, self._max_gen_num + 1):
+                    self._start_metrics()
+                    self.evolve()
+                    self._generation_number = i
+                    if self._rate_schedule is not None:
+                        self._p_cross, self._p_mutation = self._rate_schedule(self)
+                    self._callback()
+                    if self._progress:
+                        bar.update(i, Best=self._best_fitness, Average=numpy.mean(self._fitness_list))
+                    # criteria are updated before the checkpoint so that it holds their state after generation i
+                    self.stop_reason = next((c for c in self._stopping if c(self)), None)
+                    elapsed = time.monotonic() - checkpoint_time
+                    if self._checkpoint_file is not None and (
+                            (self._checkpoint_every and i % self._checkpoint_every == 0) or
+                            (self._checkpoint_seconds and elapsed >= self._checkpoint_seconds)):
+                        self.save_checkpoint(self._checkpoint_file, i, background=True)
+                        checkpoint_time = time.monotonic()
+                    if self.stop_reason is not None:
+                        break
+        finally:
+            self.close()
+            if self.cache is not None and self.cache.filename is not None:
+                self.cache.save()
+            self.wait_checkpoint()
+        return
+
+    def _callback(self):
+        if self._callbacks:
+            metrics = self.metrics()
+            for callback in self._callbacks:
+                callback(metrics)
         return
 
     def result(self):
@@ -261,3 +728,16 @@ class GeneticAlgorithm:
         """
         mean_fitness = numpy.mean(self._fitness_list)
         print('Best:', ''.join(self._best_individual), '%.3f' % self._best_fitness, 'Mean:%.3f' % mean_fitness)
+
+
+def _write_checkpoint(filename, state):
+    tmp_filename = filename + '.tmp'
+    try:
+        with open(tmp_filename, 'wb') as checkpoint_file:
+            pickle.dump(state, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filename, filename)
+    except BaseException:
+        # the previous checkpoint is left as it was, without a partial .tmp file next to it
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
@@ -0,0 +1,174 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy
+from nzsci.optimization.numpy_genetic_algorithm import NumpyGeneticAlgorithm
+
+
+class IslandGeneticAlgorithm:
+    """
+    Island model Genetic Algorithm: several sub-populations (islands) evolve in separate worker processes and
+    periodically exchange their best individuals. Migrants, per-island statistics and results go through shared memory
+    buffers, so the only inter-process traffic is a barrier per migration
+    """
+
+    def __init__(self, n_islands: int, max_gen: int, pop_generation: int, p_cross: float, p_mutation: float,
+                 n_genes: int, parameters_range: list, fitness_func=None, batch_fitness_func=None,
+                 migration_interval: int = 10, n_migrants: int = 2, topology: str = 'ring', seed: int = None):
+        """
+        Constructor.
+
+        :param int n_islands: number of islands, each one runs in its own process
+        :param int max_gen: maximum generation number, the limit of iteration
+        :param int pop_generation: population of one generation on each island
+        :param float p_cross: probability of cross interchange
+        :param float p_mutation: probability of mutation
+        :param int n_genes: number of genes (equals to the number of parameters)
+        :param list parameters_range: a list of parameters' ranges, one row for each parameter [lower, upper, accuracy],
+                                      for integer parameters, just set accuracy as 1
+        :param function fitness_func: fitness function, must be picklable (module level)
+        :param function batch_fitness_func: optional batched fitness function, must be picklable (module level)
+        :param int migration_interval: number of generations between two migrations
+        :param int n_migrants: number of best individuals each island sends per migration
+        :param str topology: 'ring' (island k receives from island k-1) or 'full' (every island receives the best
+                             migrants of all others)
+        :param int seed: seed of the islands' random generators, None for a non-reproducible run
+        :raise ValueError: If the topology is unknown
+        """
+        if topology not in ('ring', 'full'):
+            raise ValueError('Unknown topology: ' + str(topology))
+        self._n_islands = n_islands
+        self._max_gen_num = max_gen
+        self._ga_args = (max_gen, pop_generation, p_cross, p_mutation, n_genes, parameters_range)
+        self._ga_kwargs = {'fitness_func': fitness_func, 'batch_fitness_func': batch_fitness_func}
+        self._migration_interval = migration_interval
+        self._n_migrants = min(n_migrants, pop_generation)
+        self._topology = topology
+        self._seed = seed
+
+        # DNA length is only known to a GeneticAlgorithm, build one island locally to get it
+        self._dna_length = NumpyGeneticAlgorithm(*self._ga_args, **self._ga_kwargs)._dna_length
+        self.history = numpy.zeros((n_islands, max_gen + 1, 2))
+        self._best_fitness = 0.0
+        self._best_individual = numpy.zeros(self._dna_length, dtype=numpy.uint8)
+        self._island_best_fitness = numpy.zeros(n_islands)
+        return
+
+    def sources(self, island: int):
+        """
+        Islands sending migrants to an island, according to the topology
+
+        :param int island: island index
+        :return: source islands
+        :rtype: list
+        """
+        if self._topology == 'ring':
+            return [(island - 1) % self._n_islands]
+        return [k for k in range(self._n_islands) if k != island]
+
+    def run(self):
+        """
+        Start the islands and wait for them to finish 'maxGen' generations
+
+        :raise RuntimeError: If an island process failed
+        """
+        shapes = {
+            'migrants_dna': ((self._n_islands, self._n_migrants, self._dna_length), numpy.uint8),
+            'migrants_fitness': ((self._n_islands, self._n_migrants), numpy.float64),
+            'history': ((self._n_islands, self._max_gen_num + 1, 2), numpy.float64),
+            'best_dna': ((self._n_islands, self._dna_length), numpy.uint8),
+            'best_fitness': ((self._n_islands,), numpy.float64)
+        }
+        buffers = {}
+        for name, (shape, dtype) in shapes.items():
+            size = max(1, int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize)
+            buffers[name] = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            barrier = multiprocessing.Barrier(self._n_islands)
+            seeds = numpy.random.SeedSequence(self._seed).spawn(self._n_islands)
+            processes = [multiprocessing.Process(target=_island_worker, args=(
+                island, self._ga_args, self._ga_kwargs, seeds[island], self._migration_interval, self._n_migrants,
+                self.sources(island), shapes, buffers, barrier)) for island in range(self._n_islands)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            if any(process.exitcode != 0 for process in processes):
+                raise RuntimeError('Island process failed.')
+
+            arrays = _shared_arrays(shapes, buffers)
+            self.history = arrays['history'].copy()
+            self._island_best_fitness = arrays['best_fitness'].copy()
+            best = numpy.argmax(self._island_best_fitness)
+            self._best_fitness = self._island_best_fitness[best]
+            self._best_individual = arrays['best_dna'][best].copy()
+            del arrays
+        finally:
+            for shm in buffers.values():
+                shm.close()
+                shm.unlink()
+        return
+
+    @property
+    def best_fitness(self):
+        """
+        Best fitness found on all islands
+        """
+        return self._best_fitness
+
+    @property
+    def best_individual(self):
+        """
+        DNA of the best individual found on all islands
+        """
+        return self._best_individual
+
+    def island_results(self):
+        """
+        Best and mean fitness of the last generation of each island
+
+        :return: one (best, mean) row per island
+        :rtype: numpy.ndarray
+        """
+        return self.history[:, -1, :].copy()
+
+    def result(self):
+        """
+        Display the results
+            - best and mean fitness of each island
+            - best individual and best fitness over all islands
+        """
+        for island, (best_fitness, mean_fitness) in enumerate(self.island_results()):
+            print('Island %d:' % island, 'Best:%.3f' % best_fitness, 'Mean:%.3f' % mean_fitness)
+        print('Best:', ''.join(self._best_individual.astype(str)), '%.3f' % self._best_fitness)
+
+
+def _shared_arrays(shapes, buffers):
+    return {name: numpy.ndarray(shape, dtype=dtype, buffer=buffers[name].buf) for name, (shape, dtype) in
+            shapes.items()}
+
+
+def _island_worker(island, ga_args, ga_kwargs, seed, migration_interval, n_migrants, sources, shapes, buffers,
+                   barrier):
+    arrays = _shared_arrays(shapes, buffers)
+    try:
+        ga = NumpyGeneticAlgorithm(*ga_args, seed=seed, **ga_kwargs)
+        ga.ini_generation()
+        arrays['history'][island, 0] = ga.best_fitness, ga.mean_fitness
+        for i in range(1, ga_args[0] + 1):
+            ga.evolve()
+            if migration_interval and sources and i % migration_interval == 0:  # a single 'full' island has none
+                arrays['migrants_dna'][island], arrays['migrants_fitness'][island] = ga.migrants(n_migrants)
+                barrier.wait()
+                dna = arrays['migrants_dna'][sources].reshape(-1, arrays['migrants_dna'].shape[-1])
+                fitness = arrays['migrants_fitness'][sources].reshape(-1)
+                idx = numpy.argsort(fitness)[::-1][:n_migrants]
+                ga.immigrate(dna[idx], fitness[idx])
+                barrier.wait()  # nobody overwrites its migrants before all islands read them
+            arrays['history'][island, i] = ga.best_fitness, ga.mean_fitness
+        arrays['best_dna'][island] = ga.best_individual
+        arrays['best_fitness'][island] = ga.best_fitness
+    except Exception:
+        barrier.abort()
+        raise
+    finally:
+        del arrays
@@ -0,0 +1,78 @@
+"""
+Callbacks collecting the per-generation metrics of the genetic algorithm (see GeneticAlgorithm.metrics)
+"""
+
+
+import csv
+import json
+import math
+import os
+import numpy
+
+
+class MetricsHistory:
+    """
+    Keep the metrics of every generation in memory
+    """
+
+    def __init__(self):
+        self.records = []
+        return
+
+    def __call__(self, metrics: dict):
+        self.records.append(metrics)
+        return
+
+    def __len__(self):
+        return len(self.records)
+
+    def as_array(self):
+        """
+        Metrics as a structured array, one row per generation and one float field per metric
+
+        :return: metrics history
+        :rtype: numpy.ndarray
+        """
+        if not self.records:
+            return numpy.zeros(0)
+        names = list(self.records[0])
+        return numpy.array([tuple(record[name] for name in names) for record in self.records],
+                           dtype=[(name, float) for name in names])
+
+
+class MetricsLogger:
+    """
+    Append the metrics of every generation to a CSV or JSON-lines file, undefined values are null in JSON lines
+    """
+
+    def __init__(self, filename: str, file_format: str = None):
+        """
+        Constructor.
+
+        :param str filename: log file name, new lines are appended if it exists
+        :param str file_format: 'csv' or 'jsonl', None to guess it from the file extension (default 'csv')
+        :raise ValueError: If the format is unknown
+        """
+        if file_format is None:
+            file_format = 'jsonl' if filename.endswith(('.jsonl', '.json')) else 'csv'
+        if file_format not in ('csv', 'jsonl'):
+            raise ValueError('Unknown metrics file format: ' + str(file_format))
+        self.filename = filename
+        self.file_format = file_format
+        return
+
+    def __call__(self, metrics: dict):
+        write_header = self.file_format == 'csv' and \
+            (not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0)
+        with open(self.filename, 'a', newline='') as log_file:
+            if self.file_format == 'jsonl':
+                # undefined metrics (NaN) are written as null, bare NaN is not valid JSON
+                record = {name: None if isinstance(value, float) and not math.isfinite(value) else value
+                          for name, value in metrics.items()}
+                log_file.write(json.dumps(record, allow_nan=False) + '\n')
+            else:
+                writer = csv.DictWriter(log_file, fieldnames=list(metrics))
+                if write_header:
+                    writer.writeheader()
+                writer.writerow(metrics)
+        return
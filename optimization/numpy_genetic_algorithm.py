@@ -0,0 +1,258 @@
+import numpy
+import nzsci.math.number as number
+from nzsci.optimization.genetic_algorithm import GeneticAlgorithm
+
+
+class NumpyGeneticAlgorithm(GeneticAlgorithm):
+    """
+    Genetic Algorithm with a NumPy population engine. The whole generation is kept as one 2-D uint8 array (one row
+    per individual, one column per DNA bit) and selection, cross and mutation each run as one batched array operation
+    per generation, driven by a seeded numpy.random.Generator
+    """
+
+    def __init__(self, max_gen: int, pop_generation: int, p_cross: float,
+                 p_mutation: float, n_genes: int, parameters_range: list, fitness_func=None,
+                 batch_fitness_func=None, executor='serial', n_workers: int = None, chunk_size: int = None,
+                 cache_size: int = 0, cache_file: str = None, cache_key=None, checkpoint_file: str = None,
+                 checkpoint_every: int = 0, checkpoint_seconds: float = 0, stopping: list = None,
+                 rate_schedule=None, callbacks: list = None, progress: bool = True, seed: int = None):
+
+        """
+        Constructor.
+
+        :param int max_gen: maximum generation number, the limit of iteration
+        :param int pop_generation: population of one generation
+        :param float p_cross: probability of cross interchange
+        :param float p_mutation: probability of mutation
+        :param int n_genes: number of genes (equals to the number of parameters)
+        :param list parameters_range: a list of parameters' ranges, one row for each parameter [lower, upper, accuracy],
+                                      for integer parameters, just set accuracy as 1
+        :param function fitness_func: refer to the fitness function, which should be a function that receive parameters
+                                    as input and return fitness value
+        :param function batch_fitness_func: optional batched fitness function, which receive the parameters of the
+                                            whole population as a (n_pop, n_genes) array and return n_pop fitness
+                                            values, it is called once per generation instead of fitness_func
+        :param str or concurrent.futures.Executor executor: how fitness is evaluated, 'serial' (default), 'thread',
+                                                            'process' or a user-supplied Executor. For 'process' the
+                                                            fitness function must be picklable (module level)
+        :param int n_workers: number of workers of the 'thread'/'process' pool, None for the number of CPUs
+        :param int chunk_size: individuals sent to a worker per task, None for an even split between workers
+        :param int cache_size: maximum number of fitness values memoized by DNA (LRU eviction), 0 disables the cache
+        :param str cache_file: file the fitness cache is loaded from and saved to at the end of run()
+        :param cache_key: identifies the fitness function in the signature of the cache file, a cache file is only
+                          reused for the same parameters' ranges and key. None for the module and qualified name of
+                          the fitness function, set it when the function changes but keeps its name
+        :param str checkpoint_file: file the run is checkpointed to, see resume()
+        :param int checkpoint_every: write a checkpoint every N generations, 0 to disable
+        :param float checkpoint_seconds: write a checkpoint when T seconds passed since the last one, 0 to disable
+        :param list stopping: stopping criteria (see nzsci.optimization.stopping), the run stops before 'maxGen' as
+                              soon as one of them is met
+        :param function rate_schedule: called after every generation with this object, returns the (p_cross,
+                                       p_mutation) of the next generation, e.g. stopping.AdaptiveRates
+        :param list callbacks: functions called after every generation with the metrics dict of that generation
+                               (see metrics()), e.g. nzsci.optimization.metrics.MetricsHistory or MetricsLogger
+        :param bool progress: display a progressbar, set False to run headless (e.g. in batch jobs)
+        :param int seed: seed of the numpy.random.Generator, None for a non-reproducible run
+        :raise ValueError: If neither fitness_func nor batch_fitness_func is given, or executor is unknown
+        """
+        super().__init__(max_gen, pop_generation, p_cross, p_mutation, n_genes, parameters_range,
+                         fitness_func=fitness_func, batch_fitness_func=batch_fitness_func, executor=executor,
+                         n_workers=n_workers, chunk_size=chunk_size, cache_size=cache_size, cache_file=cache_file,
+                         cache_key=cache_key, checkpoint_file=checkpoint_file, checkpoint_every=checkpoint_every,
+                         checkpoint_seconds=checkpoint_seconds, stopping=stopping, rate_schedule=rate_schedule,
+                         callbacks=callbacks, progress=progress)
+        self._rng = numpy.random.default_rng(seed)
+        self._generation = numpy.zeros((self._pop_generation, self._dna_length), dtype=numpy.uint8)
+        self._fitness_list = numpy.zeros(self._pop_generation)
+        self._best_individual = numpy.zeros(self._dna_length, dtype=numpy.uint8)
+        return
+
+    def encode(self, parameters: list):
+        """
+        Encode parameters into DNA, gray code
+
+        :param list parameters: list of parameters
+        :return: DNA, one uint8 per bit
+        :rtype: numpy.ndarray
+        """
+        dna = []
+        for i in range(self._n_genes):
+            gene_sequence_digit = (parameters[i] - self._parameters_range[i][0]) \
+                                  / (self._parameters_range[i][1] - self._parameters_range[i][0]) \
+                                  * (2 ** self._gene_length[i] - 1)
+            gene_sequence_gray = number.int2gray_array(numpy.rint(gene_sequence_digit))
+            dna.append(number.unpack_bits(gene_sequence_gray, self._gene_length[i]))
+        return numpy.concatenate(dna)
+
+    def decode(self, dna):
+        """
+        Decode DNA to parameters
+
+        :param numpy.ndarray dna: DNA sequence, one uint8 per bit
+        :return: parameters
+        :rtype: list
+        """
+        return self.decode_population(dna)[0].tolist()
+
+    def random_generation(self):
+        """
+        Create a random generation. Gray code is a bijection on n-bit integers, so uniform random bits are the same
+        as uniform random gene values
+
+        :return: random generation, one row per individual
+        :rtype: numpy.ndarray
+        """
+        return self._rng.integers(0, 2, size=(self._pop_generation, self._dna_length), dtype=numpy.uint8)
+
+    def random_dna(self):
+        """
+        Create random DNA for initially generation
+
+        :return: random DNA sequence
+        :rtype: numpy.ndarray
+        """
+        return self._rng.integers(0, 2, size=self._dna_length, dtype=numpy.uint8)
+
+    def ini_generation(self):
+        """
+        Generate initially generation
+        """
+        self._generation = self.random_generation()
+        self.fitness()
+        idx = numpy.argmax(self._fitness_list)
+        self._best_fitness = self._fitness_list[idx]
+        self._best_individual = self._generation[idx].copy()
+        return
+
+    def mutation(self):
+        """
+        Mutation at a random point for a preset probability (entire generation)
+        """
+        mutated = self._rng.random(self._pop_generation) < self._p_mutation
+        mutation_points = self._rng.integers(0, self._dna_length, size=self._pop_generation)
+        self._generation[mutated, mutation_points[mutated]] ^= 1
+        return
+
+    def cross(self):
+        """
+        Cross interchange at a random point for a preset probability (entire generation). Every crossed individual
+        takes the tail of its pair starting at the cross point, pairs are drawn from the generation before crossing
+        """
+        n = self._pop_generation
+        crossed = self._rng.random(n) < self._p_cross
+        pairs = self._rng.integers(0, n - 1, size=n)
+        pairs = pairs + (pairs >= numpy.arange(n))  # never pair an individual with itself
+        cross_points = self._rng.integers(0, self._dna_length, size=n)
+        mask = (numpy.arange(self._dna_length) >= cross_points[:, None]) & crossed[:, None]
+        self._generation = numpy.where(mask, self._generation[pairs], self._generation)
+        return
+
+    def select(self):
+        """
+        Select better individuals with a championships strategy, using the fitness already calculated for the current
+        generation
+        """
+        n_candidates = 2
+        candidates = self._rng.integers(0, self._pop_generation, size=(self._pop_generation, n_candidates))
+        winners = candidates[numpy.arange(self._pop_generation), numpy.argmax(self._fitness_list[candidates], axis=1)]
+        self._generation = self._generation[winners]
+        self._fitness_list = self._fitness_list[winners]
+        return
+
+    def elitist_reservation(self):
+        """
+        Elitist preservation: always preserve the best one
+        """
+        idx = numpy.argmax(self._fitness_list)
+        if self._fitness_list[idx] > self._best_fitness:
+            self._best_fitness = self._fitness_list[idx]
+            self._best_individual = self._generation[idx].copy()
+        else:
+            idx = numpy.argmin(self._fitness_list)
+            self._generation[idx] = self._best_individual
+            self._fitness_list[idx] = self._best_fitness
+        return
+
+    def migrants(self, n_migrants: int):
+        """
+        Best individuals of the current generation, to be sent to another population
+
+        :param int n_migrants: number of migrants
+        :return: DNA of the migrants (one row each) and their fitness
+        :rtype: numpy.ndarray, numpy.ndarray
+        """
+        idx = numpy.argsort(self._fitness_list)[::-1][:n_migrants]
+        return self._generation[idx].copy(), self._fitness_list[idx].copy()
+
+    def immigrate(self, dna, fitness):
+        """
+        Replace the worst individuals of the current generation by immigrants, nothing is done without immigrants
+
+        :param numpy.ndarray dna: DNA of the immigrants, one row each
+        :param numpy.ndarray fitness: fitness of the immigrants
+        """
+        if len(fitness) == 0:
+            return
+        idx = numpy.argsort(self._fitness_list)[:len(fitness)]
+        self._generation[idx] = dna
+        self._fitness_list[idx] = fitness
+        best = numpy.argmax(fitness)
+        if fitness[best] > self._best_fitness:
+            self._best_fitness = fitness[best]
+            self._best_individual = numpy.array(dna[best], dtype=self._generation.dtype)
+        return
+
+    def fitness(self, candidates: str or numpy.ndarray = 'None'):
+        """
+        Calculate fitness for input candidates or for all individuals of current generation (default)
+
+        :param numpy.ndarray or str candidates: either be an array of candidates or 'None' (default, all individuals)
+        :return: array of fitness
+        :rtype: numpy.ndarray
+        """
+        if isinstance(candidates, str):
+            self._fitness_list = numpy.array(self.evaluate(self._generation))
+            return
+        else:
+            return numpy.array(self.evaluate(candidates))
+
+    def get_state(self):
+        """
+        Snapshot of the run state: population, fitness list, best individual and RNG state
+
+        :return: state
+        :rtype: dict
+        """
+        state = super().get_state()
+        state['rng_state'] = self._rng.bit_generator.state
+        return state
+
+    def set_state(self, state: dict):
+        """
+        Restore a state created by get_state()
+
+        :param dict state: state
+        :raise ValueError: If the state was created for a different DNA length
+        """
+        if state['dna_length'] != self._dna_length:
+            raise ValueError('State was saved for a different DNA length.')
+        self._generation = numpy.unpackbits(state['generation'], axis=1, count=self._dna_length)
+        self._fitness_list = state['fitness_list'].copy()
+        self._best_fitness = state['best_fitness']
+        self._best_individual = numpy.unpackbits(state['best_individual'], count=self._dna_length)
+        self._rng.bit_generator.state = state['rng_state']
+        self._p_cross = state['p_cross']
+        self._p_mutation = state['p_mutation']
+        self._set_control_state(state.get('control_state'))
+        return
+
+    def result(self):
+        """
+        Display the results
+            - best individual
+            - best fitness
+            - mean fitness
+        """
+        mean_fitness = numpy.mean(self._fitness_list)
+        print('Best:', ''.join(self._best_individual.astype(str)), '%.3f' % self._best_fitness,
+              'Mean:%.3f' % mean_fitness)
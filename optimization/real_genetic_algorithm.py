@@ -0,0 +1,238 @@
+import numpy
+from nzsci.optimization.numpy_genetic_algorithm import NumpyGeneticAlgorithm
+
+
+class RealGeneticAlgorithm(NumpyGeneticAlgorithm):
+    """
+    Genetic Algorithm with a real-valued genome: each individual is directly its vector of parameters, so there is
+    no encode/decode step. Cross is SBX or blend (BLX-alpha), mutation is gaussian. Parameters with accuracy 1 are
+    integers and are kept rounded. Selection, elitism and run() are shared with the bit string engines
+    """
+
+    genome_dtype = numpy.float64
+
+    def __init__(self, *args, crossover: str = 'sbx', eta: float = 15.0, alpha: float = 0.5, sigma: float = 0.1,
+                 **kwargs):
+        """
+        Constructor, takes the same parameters as NumpyGeneticAlgorithm plus the operators' settings.
+
+        :param str crossover: 'sbx' (simulated binary crossover) or 'blend' (BLX-alpha)
+        :param float eta: distribution index of SBX, a larger one keeps children closer to their parents
+        :param float alpha: extension of the BLX-alpha interval beyond the parents
+        :param float sigma: standard deviation of the gaussian mutation, as a fraction of each parameter's range
+        :raise ValueError: If the crossover is unknown
+        """
+        if crossover not in ('sbx', 'blend'):
+            raise ValueError('Unknown crossover: ' + str(crossover))
+        super().__init__(*args, **kwargs)
+        self._crossover = crossover
+        self._eta = eta
+        self._alpha = alpha
+        self._sigma = sigma
+        self._lower = numpy.array([r[0] for r in self._parameters_range], dtype=float)
+        self._upper = numpy.array([r[1] for r in self._parameters_range], dtype=float)
+        self._integer = numpy.array([r[2] == 1 for r in self._parameters_range])
+        self._integer_lower = numpy.where(self._integer, numpy.ceil(self._lower), 0).astype(numpy.int64)
+        self._integer_upper = numpy.where(self._integer, numpy.floor(self._upper), 0).astype(numpy.int64)
+        self._dna_length = self._n_genes
+        self._generation = numpy.zeros((self._pop_generation, self._n_genes), dtype=self.genome_dtype)
+        self._best_individual = numpy.zeros(self._n_genes, dtype=self.genome_dtype)
+        return
+
+    def repair(self, genome):
+        """
+        Clip genes into their range and round integer genes
+
+        :param numpy.ndarray genome: genes, one row for each individual
+        :return: repaired genome
+        :rtype: numpy.ndarray
+        """
+        genome = numpy.clip(genome, self._lower, self._upper)
+        genome = numpy.where(self._integer, numpy.rint(genome), genome)
+        return genome.astype(self.genome_dtype)
+
+    def encode(self, parameters: list):
+        """
+        Encode parameters into DNA, which are the parameters themselves
+
+        :param list parameters: list of parameters
+        :return: DNA
+        :rtype: numpy.ndarray
+        """
+        return self.repair(numpy.asarray(parameters, dtype=float))
+
+    def decode_population(self, generation):
+        """
+        Parameters of a whole population, which are the genomes themselves
+
+        :param numpy.ndarray generation: genomes, one row for each individual
+        :return: parameters, one row for each individual
+        :rtype: numpy.ndarray
+        """
+        return numpy.array(generation, dtype=float).reshape(-1, self._n_genes)
+
+    def population_bits(self, generation):
+        """
+        Genome matrix of a population, real genomes have no bits
+
+        :param numpy.ndarray generation: genomes, one row for each individual
+        :return: genomes, one row for each individual
+        :rtype: numpy.ndarray
+        """
+        return numpy.asarray(generation, dtype=self.genome_dtype).reshape(-1, self._n_genes)
+
+    def population_keys(self, bits):
+        """
+        Keys of the fitness cache: raw bytes of each genome
+
+        :param numpy.ndarray bits: genomes, one row for each individual
+        :return: keys
+        :rtype: list
+        """
+        return [row.tobytes() for row in numpy.ascontiguousarray(bits)]
+
+    def diversity(self):
+        """
+        Diversity of the current generation: mean over genes of the standard deviation relative to the one of a
+        uniform distribution over the parameter's range. Genes with an empty range (lower == upper) are left out,
+        0 if all of them are
+
+        :return: diversity, between 0 and 1
+        :rtype: float
+        """
+        width = self._upper - self._lower
+        varying = width > 0
+        if not varying.any():
+            return 0.0
+        spread = numpy.std(self._generation[:, varying], axis=0) * numpy.sqrt(12) / width[varying]
+        return float(numpy.mean(numpy.minimum(spread, 1.0)))
+
+    def random_generation(self):
+        """
+        Create a random generation, uniform over the parameters' ranges
+
+        :return: random generation, one row per individual
+        :rtype: numpy.ndarray
+        """
+        genome = self._rng.uniform(self._lower, self._upper, size=(self._pop_generation, self._n_genes))
+        integer_genome = self._rng.integers(self._integer_lower, self._integer_upper, size=genome.shape,
+                                            endpoint=True)
+        return self.repair(numpy.where(self._integer, integer_genome, genome))
+
+    def random_dna(self):
+        """
+        Create random DNA for initially generation
+
+        :return: random DNA
+        :rtype: numpy.ndarray
+        """
+        genome = self._rng.uniform(self._lower, self._upper)
+        integer_genome = self._rng.integers(self._integer_lower, self._integer_upper, endpoint=True)
+        return self.repair(numpy.where(self._integer, integer_genome, genome))
+
+    def mutation(self):
+        """
+        Gaussian mutation of a random gene for a preset probability (entire generation), integer genes move by at
+        least one
+        """
+        mutated = numpy.flatnonzero(self._rng.random(self._pop_generation) < self._p_mutation)
+        genes = self._rng.integers(0, self._n_genes, size=len(mutated))
+        steps = self._rng.normal(0.0, self._sigma, size=len(mutated)) * (self._upper - self._lower)[genes]
+        integer = self._integer[genes]
+        steps[integer] = numpy.rint(steps[integer])
+        still = integer & (steps == 0)
+        steps[still] = self._rng.choice([-1.0, 1.0], size=numpy.count_nonzero(still))
+        genome = self._generation.astype(float)
+        genome[mutated, genes] += steps
+        self._generation = self.repair(genome)
+        return
+
+    def cross(self):
+        """
+        SBX or blend cross for a preset probability (entire generation), each crossed individual is replaced by one
+        child of itself and a random pair drawn from the generation before crossing
+        """
+        n = self._pop_generation
+        crossed = self._rng.random(n) < self._p_cross
+        pairs = self._rng.integers(0, n - 1, size=n)
+        pairs = pairs + (pairs >= numpy.arange(n))  # never pair an individual with itself
+        parents = self._generation.astype(float)
+        mates = parents[pairs]
+        u = self._rng.random((n, self._n_genes))
+        if self._crossover == 'sbx':
+            beta = numpy.where(u <= 0.5, (2 * u) ** (1 / (self._eta + 1)),
+                               (1 / (2 * (1 - u))) ** (1 / (self._eta + 1)))
+            children = 0.5 * ((1 + beta) * parents + (1 - beta) * mates)
+        else:
+            gamma = (1 + 2 * self._alpha) * u - self._alpha
+            children = parents + gamma * (mates - parents)
+        self._generation = self.repair(numpy.where(crossed[:, None], children, parents))
+        return
+
+    def get_state(self):
+        """
+        Snapshot of the run state: population, fitness list, best individual and RNG state
+
+        :return: state
+        :rtype: dict
+        """
+        return {
+            'dna_length': self._dna_length,
+            'generation': self._generation.copy(),
+            'fitness_list': numpy.array(self._fitness_list, dtype=float),
+            'best_fitness': float(self._best_fitness),
+            'best_individual': self._best_individual.copy(),
+            'rng_state': self._rng.bit_generator.state,
+            'p_cross': self._p_cross,
+            'p_mutation': self._p_mutation,
+            'control_state': self._control_state()
+        }
+
+    def set_state(self, state: dict):
+        """
+        Restore a state created by get_state()
+
+        :param dict state: state
+        :raise ValueError: If the state was created for a different number of genes
+        """
+        if state['dna_length'] != self._dna_length:
+            raise ValueError('State was saved for a different number of genes.')
+        self._generation = state['generation'].astype(self.genome_dtype)
+        self._fitness_list = state['fitness_list'].copy()
+        self._best_fitness = state['best_fitness']
+        self._best_individual = state['best_individual'].astype(self.genome_dtype)
+        self._rng.bit_generator.state = state['rng_state']
+        self._p_cross = state['p_cross']
+        self._p_mutation = state['p_mutation']
+        self._set_control_state(state.get('control_state'))
+        return
+
+    def result(self):
+        """
+        Display the results
+            - best individual (its parameters)
+            - best fitness
+            - mean fitness
+        """
+        mean_fitness = numpy.mean(self._fitness_list)
+        print('Best:', self._best_individual.tolist(), '%.3f' % self._best_fitness, 'Mean:%.3f' % mean_fitness)
+
+
+class IntegerGeneticAlgorithm(RealGeneticAlgorithm):
+    """
+    Genetic Algorithm with an integer genome, for problems whose parameters all have accuracy 1. Operators are the
+    ones of RealGeneticAlgorithm, genes are stored as int64
+    """
+
+    genome_dtype = numpy.int64
+
+    def __init__(self, *args, **kwargs):
+        """
+        Constructor, takes the same parameters as RealGeneticAlgorithm.
+
+        :raise ValueError: If a parameter's accuracy is not 1
+        """
+        super().__init__(*args, **kwargs)
+        if not numpy.all(self._integer):
+            raise ValueError('All parameters of an integer genome should have accuracy 1.')
+        return
@@ -0,0 +1,180 @@
+"""
+Stopping criteria and adaptive operator rates for the genetic algorithm.
+
+A stopping criterion is called with the GeneticAlgorithm after every generation and returns True to stop the run,
+reset(), if defined, is called when a run starts. A rate schedule is called after every generation and returns the
+(p_cross, p_mutation) to use for the next one. The state of criteria and schedules (get_state/set_state) is saved in
+the checkpoints of the run, so a resumed run stops at the same generation as an uninterrupted one.
+"""
+
+
+import time
+
+
+class StallGenerations:
+    """
+    Stop when the best fitness has not improved for a number of generations
+    """
+
+    def __init__(self, n_generations: int, tolerance: float = 0.0):
+        """
+        Constructor.
+
+        :param int n_generations: number of generations without improvement before stopping
+        :param float tolerance: minimum increase of the best fitness counted as an improvement
+        """
+        self.n_generations = n_generations
+        self.tolerance = tolerance
+        self.reset()
+        return
+
+    def reset(self):
+        self._best_fitness = None
+        self._stall = 0
+        return
+
+    def get_state(self):
+        return {'best_fitness': self._best_fitness, 'stall': self._stall}
+
+    def set_state(self, state: dict):
+        self._best_fitness = state['best_fitness']
+        self._stall = state['stall']
+        return
+
+    def __call__(self, ga):
+        if self._best_fitness is None or ga.best_fitness > self._best_fitness + self.tolerance:
+            self._best_fitness = ga.best_fitness
+            self._stall = 0
+        else:
+            self._stall += 1
+        return self._stall >= self.n_generations
+
+    def __repr__(self):
+        return 'StallGenerations(%d)' % self.n_generations
+
+
+class TargetFitness:
+    """
+    Stop when the best fitness reaches a target
+    """
+
+    def __init__(self, target: float):
+        """
+        Constructor.
+
+        :param float target: target fitness
+        """
+        self.target = target
+        return
+
+    def reset(self):
+        return
+
+    def get_state(self):
+        return {}
+
+    def set_state(self, state: dict):
+        return
+
+    def __call__(self, ga):
+        return ga.best_fitness >= self.target
+
+    def __repr__(self):
+        return 'TargetFitness(%r)' % self.target
+
+
+class TimeBudget:
+    """
+    Stop when the wall-clock time since the start of the run exceeds a budget
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Constructor.
+
+        :param float seconds: time budget in seconds
+        """
+        self.seconds = seconds
+        self.reset()
+        return
+
+    def reset(self):
+        self._start = time.monotonic()
+        return
+
+    def get_state(self):
+        return {'elapsed': time.monotonic() - self._start}
+
+    def set_state(self, state: dict):
+        # the time spent before the checkpoint counts against the budget
+        self._start = time.monotonic() - state['elapsed']
+        return
+
+    def __call__(self, ga):
+        return time.monotonic() - self._start >= self.seconds
+
+    def __repr__(self):
+        return 'TimeBudget(%r)' % self.seconds
+
+
+class DiversityThreshold:
+    """
+    Stop when the population diversity (see GeneticAlgorithm.diversity) falls below a threshold
+    """
+
+    def __init__(self, min_diversity: float):
+        """
+        Constructor.
+
+        :param float min_diversity: diversity threshold, between 0 (converged) and 1
+        """
+        self.min_diversity = min_diversity
+        return
+
+    def reset(self):
+        return
+
+    def get_state(self):
+        return {}
+
+    def set_state(self, state: dict):
+        return
+
+    def __call__(self, ga):
+        return ga.diversity() < self.min_diversity
+
+    def __repr__(self):
+        return 'DiversityThreshold(%r)' % self.min_diversity
+
+
+class AdaptiveRates:
+    """
+    Diversity driven operator rates: a diverse population gets more cross and less mutation, a converging one less
+    cross and more mutation. Rates are interpolated linearly between their limits, a diversity above
+    target_diversity counts as fully diverse
+    """
+
+    def __init__(self, p_cross: tuple = (0.5, 0.9), p_mutation: tuple = (0.01, 0.2), target_diversity: float = 0.3):
+        """
+        Constructor.
+
+        :param tuple p_cross: (lower, upper) probability of cross interchange
+        :param tuple p_mutation: (lower, upper) probability of mutation
+        :param float target_diversity: diversity at which cross is the highest and mutation the lowest
+        """
+        self.p_cross = p_cross
+        self.p_mutation = p_mutation
+        self.target_diversity = target_diversity
+        return
+
+    def get_state(self):
+        return {}
+
+    def set_state(self, state: dict):
+        return
+
+    def __call__(self, ga):
+        ratio = min(ga.diversity() / self.target_diversity, 1.0)
+        p_cross = self.p_cross[0] + (self.p_cross[1] - self.p_cross[0]) * ratio
+        p_mutation = self.p_mutation[1] - (self.p_mutation[1] - self.p_mutation[0]) * ratio
+        return p_cross, p_mutation
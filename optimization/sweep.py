@@ -0,0 +1,337 @@
+"""
+Parameter grid sweeps: lazy grid indexing, chunked parallel evaluation and an append-only result store, so a sweep
+of any size runs in flat memory and resumes after being killed.
+"""
+
+
+import concurrent.futures
+import hashlib
+import itertools
+import os
+import pickle
+import numpy
+
+
+class ParameterGrid:
+    """
+    Cartesian product of parameter lists, indexed lazily in mixed radix: combination i is computed from i without
+    materializing the grid. The order is the one of itertools.product (the last parameter changes fastest).
+    """
+
+    def __init__(self, parameters: list):
+        """
+        Constructor.
+
+        :param list parameters: one list of values per parameter
+        :raise ValueError: If a parameter has no value
+        """
+        self.parameters = [list(values) for values in parameters]
+        if any(len(values) == 0 for values in self.parameters):
+            raise ValueError('Every parameter should have at least one value.')
+        self.shape = tuple(len(values) for values in self.parameters)
+        self._strides = []
+        stride = 1
+        for size in reversed(self.shape):
+            self._strides.insert(0, stride)
+            stride *= size
+        self._size = stride
+        self._positions = [{value: i for i, value in enumerate(values)} if _hashable(values) else None
+                           for values in self.parameters]
+        return
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return itertools.product(*self.parameters)
+
+    def __getitem__(self, index: int):
+        """
+        Combination of an index.
+
+        :param int index: index, negative ones count from the end
+        :return: one value per parameter
+        :rtype: tuple
+        :raise IndexError: If the index is out of the grid
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('Grid index out of range: ' + str(index))
+        combination = []
+        for values, stride in zip(self.parameters, self._strides):
+            position, index = divmod(index, stride)
+            combination.append(values[position])
+        return tuple(combination)
+
+    def index(self, combination) -> int:
+        """
+        Index of a combination, inverse of grid[index].
+
+        :param combination: one value per parameter
+        :return: index
+        :rtype: int
+        :raise ValueError: If a value is not in its parameter's list
+        """
+        index = 0
+        for values, positions, stride, value in zip(self.parameters, self._positions, self._strides, combination):
+            position = positions[value] if positions is not None and value in positions else values.index(value)
+            index += position * stride
+        return index
+
+    def positions(self, start: int, stop: int):
+        """
+        Positions of the values of a range of combinations, vectorized (indices should fit in int64).
+
+        :param int start: first index
+        :param int stop: index after the last one
+        :return: positions, one row per combination and one column per parameter
+        :rtype: numpy.ndarray
+        """
+        indices = numpy.arange(start, stop, dtype=numpy.int64)
+        return numpy.stack([indices // stride % size for stride, size in zip(self._strides, self.shape)], axis=1)
+
+    def chunk(self, start: int, stop: int):
+        """
+        Combinations of a range of indices.
+
+        :param int start: first index
+        :param int stop: index after the last one
+        :return: combinations
+        :rtype: list
+        """
+        return [tuple(values[p] for values, p in zip(self.parameters, row))
+                for row in self.positions(start, min(stop, self._size)).tolist()]
+
+
+def _hashable(values):
+    try:
+        for value in values:
+            hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class ResultStore:
+    """
+    Append-only file of sweep results, one pickled record per completed chunk: (start, stop, results). A record cut
+    by a crash is discarded when the store is opened again, so only whole chunks count as completed.
+    """
+
+    def __init__(self, filename: str, signature):
+        """
+        Constructor, open or create the store.
+
+        :param str filename: file name
+        :param signature: description of the sweep (see Sweep.signature), an existing store must have the same one
+        :raise ValueError: If the existing store was created for another sweep
+        """
+        self.filename = filename
+        self.signature = signature
+        self._completed = set()
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            valid_size = 0
+            with open(filename, 'rb') as store_file:
+                for i, record in enumerate(_records(store_file)):
+                    if i == 0:
+                        if record != signature:
+                            raise ValueError('Result store %s was created for another sweep.' % filename)
+                    else:
+                        self._completed.add(record[0])
+                    valid_size = store_file.tell()
+            if valid_size < os.path.getsize(filename):
+                with open(filename, 'r+b') as store_file:
+                    store_file.truncate(valid_size)
+            self._file = open(filename, 'ab')
+            if valid_size == 0:
+                self._write(signature)
+        else:
+            self._file = open(filename, 'ab')
+            self._write(signature)
+        return
+
+    def _write(self, record):
+        pickle.dump(record, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return
+
+    def __contains__(self, start: int):
+        return start in self._completed
+
+    def __len__(self):
+        return len(self._completed)
+
+    def append(self, start: int, stop: int, results: list):
+        """
+        Append the results of a chunk.
+
+        :param int start: first index of the chunk
+        :param int stop: index after the last one
+        :param list results: one result per combination
+        """
+        self._write((start, stop, results))
+        self._completed.add(start)
+        return
+
+    def records(self):
+        """
+        Records of the completed chunks, read lazily from the file.
+
+        :return: generator of (start, stop, results)
+        """
+        self._file.flush()
+        with open(self.filename, 'rb') as store_file:
+            for i, record in enumerate(_records(store_file)):
+                if i > 0:
+                    yield record
+
+    def close(self):
+        """
+        Close the file.
+        """
+        self._file.close()
+        return
+
+
+def _records(store_file):
+    # pickled records up to the end of the file or the first incomplete one
+    while True:
+        try:
+            yield pickle.load(store_file)
+        except (EOFError, pickle.UnpicklingError, ValueError, AttributeError, IndexError):
+            return
+
+
+def _evaluate_chunk(func, parameters, start, stop):
+    grid = ParameterGrid(parameters)
+    return start, stop, [func(*combination) for combination in grid.chunk(start, stop)]
+
+
+class Sweep:
+    """
+    Evaluate a function on every combination of a parameter grid. The grid is cut into chunks dispatched to an
+    executor, at most max_pending chunks in flight, and every finished chunk is appended to the result store: a killed
+    sweep run again with the same file only evaluates the chunks not stored yet.
+    """
+
+    def __init__(self, func, grid: ParameterGrid, filename: str, chunk_size: int = 1000, executor='process',
+                 n_workers: int = None, max_pending: int = None):
+        """
+        Constructor.
+
+        :param func: function called with one argument per parameter, it should be picklable for a process executor
+        :param ParameterGrid grid: parameter grid
+        :param str filename: file of the result store
+        :param int chunk_size: number of combinations per chunk
+        :param executor: 'serial', 'thread', 'process' or a concurrent.futures.Executor
+        :param int n_workers: number of workers created by the sweep, defaults to the number of CPUs
+        :param int max_pending: maximum number of chunks in flight, defaults to twice the number of workers
+        :raise ValueError: If the executor is unknown
+        """
+        if not isinstance(executor, concurrent.futures.Executor) and executor not in ('serial', 'thread', 'process'):
+            raise ValueError('Unknown executor: ' + str(executor))
+        self.func = func
+        self.grid = grid
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.n_chunks = -(-len(grid) // chunk_size)
+        self._executor = executor
+        self._n_workers = n_workers or os.cpu_count() or 1
+        self._max_pending = max_pending or 2 * self._n_workers
+        return
+
+    def signature(self):
+        """
+        Description of the sweep checked when a result store is reopened
+
+        :return: grid shape, digest of the parameter values, chunk size and function (module, qualified name)
+        :rtype: tuple
+        """
+        digest = hashlib.sha1(pickle.dumps(self.grid.parameters, protocol=4)).hexdigest()
+        func = (getattr(self.func, '__module__', None),
+                getattr(self.func, '__qualname__', type(self.func).__qualname__))
+        return 'sweep', self.grid.shape, digest, self.chunk_size, func
+
+    def pending_chunks(self, store: ResultStore):
+        """
+        Chunks not in the store yet.
+
+        :param ResultStore store: result store
+        :return: generator of (start, stop)
+        """
+        for i in range(self.n_chunks):
+            start = i * self.chunk_size
+            if start not in store:
+                yield start, min(start + self.chunk_size, len(self.grid))
+
+    def run(self):
+        """
+        Evaluate all chunks not stored yet.
+
+        :return: number of chunks evaluated by this call
+        :rtype: int
+        """
+        store = ResultStore(self.filename, self.signature())
+        n_done = 0
+        try:
+            chunks = self.pending_chunks(store)
+            if self._executor == 'serial':
+                for start, stop in chunks:
+                    store.append(*_evaluate_chunk(self.func, self.grid.parameters, start, stop))
+                    n_done += 1
+                return n_done
+            pool = self._executor
+            if not isinstance(pool, concurrent.futures.Executor):
+                pool_class = concurrent.futures.ThreadPoolExecutor if self._executor == 'thread' else \
+                    concurrent.futures.ProcessPoolExecutor
+                pool = pool_class(max_workers=self._n_workers)
+            try:
+                pending = set()
+                for start, stop in itertools.chain(chunks, [(None, None)]):
+                    if start is not None:
+                        pending.add(pool.submit(_evaluate_chunk, self.func, self.grid.parameters, start, stop))
+                    while pending and (len(pending) >= self._max_pending or start is None):
+                        done, pending = concurrent.futures.wait(pending,
+                                                                return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            store.append(*future.result())
+                            n_done += 1
+            finally:
+                if pool is not self._executor:
+                    pool.shutdown(cancel_futures=True)
+        finally:
+            store.close()
+        return n_done
+
+    def results(self):
+        """
+        Stored results, in the order chunks were completed.
+
+        :return: generator of (index, combination, result)
+        """
+        store = ResultStore(self.filename, self.signature())
+        try:
+            for start, stop, results in store.records():
+                for index, combination, result in zip(range(start, stop), self.grid.chunk(start, stop), results):
+                    yield index, combination, result
+        finally:
+            store.close()
+
+    def best(self, key=None, maximize: bool = True):
+        """
+        Best stored result, scanning the store in flat memory.
+
+        :param key: function of a result giving the value to compare, None for the result itself
+        :param bool maximize: keep the largest value, False for the smallest
+        :return: index, combination, result of the best one, None if no result is stored
+        :rtype: tuple
+        """
+        best = None
+        best_value = None
+        for item in self.results():
+            value = item[2] if key is None else key(item[2])
+            if best is None or (value > best_value if maximize else value < best_value):
+                best, best_value = item, value
+        return best
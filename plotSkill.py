@@ -1,6 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt #导入
-import seaborn as sns
 
 def getdata():
     basecond = [[18, 20, 19, 18, 13, 4, 1],
@@ -25,18 +23,25 @@ def getdata():
     # return basecond, cond1, cond2, cond3
     return basecond, cond1
 
-data = getdata()
-fig = plt.figure()
-xdata = np.array([0, 1, 2, 3, 4, 5, 6])/5
-linestyle = ['-', '--', ':', '-.']
-color = ['r', 'g', 'b', 'k']
-label = ['algo1', 'algo2', 'algo3', 'algo4']
+def plot(data):
+    # matplotlib and seaborn are slow to import, they are only imported to plot
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure()
+    xdata = np.array([0, 1, 2, 3, 4, 5, 6])/5
+    linestyle = ['-', '--', ':', '-.']
+    color = ['r', 'g', 'b', 'k']
+    label = ['algo1', 'algo2', 'algo3', 'algo4']
+
 
+    for i in range(2):
+        sns.tsplot(time=xdata, data=data[i], color=color[i], linestyle=linestyle[i], condition=label[i])
 
-for i in range(2):
-    sns.tsplot(time=xdata, data=data[i], color=color[i], linestyle=linestyle[i], condition=label[i])
+    plt.ylabel("Success Rate", fontsize=25)
+    plt.xlabel("Iteration Number", fontsize=25)
+    plt.title("Awesome Robot Performance", fontsize=30)
+    plt.show()
 
-plt.ylabel("Success Rate", fontsize=25)
-plt.xlabel("Iteration Number", fontsize=25)
-plt.title("Awesome Robot Performance", fontsize=30)
-plt.show()
\ No newline at end of file
+
+data = getdata()
+plot(data)
@@ -0,0 +1,4 @@
+from nzsci._lazy import attach
+
+__all__ = ['decimation']
+__getattr__, __dir__ = attach(__name__, __all__)
@@ -0,0 +1,249 @@
+"""
+Decimation of long signals for plotting: min/max and LTTB (largest triangle three buckets) reduction to screen
+resolution, and a multi-resolution min/max pyramid re-decimating the visible range when a matplotlib axes is zoomed.
+"""
+
+
+import numpy as np
+
+
+def _minmax_bins(imin, vmin, imax, vmax, n_bins):
+    # merge consecutive (index, value) minima and maxima into n_bins bins, keeping each bin's extrema in time order
+    n = len(vmin)
+    size = -(-n // n_bins)
+    n_pad = -n % size
+    if n_pad:
+        imin, vmin, imax, vmax = [np.concatenate((a, np.repeat(a[-1:], n_pad))) for a in (imin, vmin, imax, vmax)]
+    rows = np.arange(len(vmin) // size)
+    vmin = vmin.reshape(-1, size)
+    vmax = vmax.reshape(-1, size)
+    argmin = np.argmin(vmin, axis=1)
+    argmax = np.argmax(vmax, axis=1)
+    imin = imin.reshape(-1, size)[rows, argmin]
+    imax = imax.reshape(-1, size)[rows, argmax]
+    vmin = vmin[rows, argmin]
+    vmax = vmax[rows, argmax]
+    first = imin <= imax
+    indices = np.column_stack((np.where(first, imin, imax), np.where(first, imax, imin))).ravel()
+    values = np.column_stack((np.where(first, vmin, vmax), np.where(first, vmax, vmin))).ravel()
+    return indices, values
+
+
+def minmax_decimate(x, n_bins, start=0, stop=None):
+    """
+    Min/max decimation: the range is cut into n_bins bins and the minimum and maximum of each bin are kept, in time
+    order, so the plotted envelope is the one of the full signal.
+
+    :param numpy.array x: signal, 1-D
+    :param int n_bins: number of bins, e.g. the width of the axes in pixels
+    :param int start: index of the first sample of the range
+    :param int stop: index after the last sample of the range, None for the end of the signal
+    :return: indexes of the kept samples, their values (at most 2 * n_bins of each)
+    :rtype: numpy.array, numpy.array
+    """
+    x = np.asarray(x)
+    stop = len(x) if stop is None else min(stop, len(x))
+    start = max(start, 0)
+    if stop - start <= 2 * n_bins:
+        return np.arange(start, stop), x[start:stop]
+    indices = np.arange(start, stop)
+    return _minmax_bins(indices, x[start:stop], indices, x[start:stop], n_bins)
+
+
+def lttb(y, n_out, x=None):
+    """
+    Largest triangle three buckets: keep n_out points, the first, the last and in each bucket the one forming the
+    largest triangle with the point kept in the previous bucket and the mean of the next bucket. It preserves the
+    visual shape better than min/max for smooth signals.
+
+    :param numpy.array y: values, 1-D
+    :param int n_out: number of points to keep
+    :param numpy.array x: abscissas of the values (sorted), None for their indexes
+    :return: indexes of the kept points, their values
+    :rtype: numpy.array, numpy.array
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    if n_out >= n or n_out < 3:
+        selected = np.arange(n) if n_out >= n else np.array([0, n - 1][:max(n_out, 0)])
+        return selected, y[selected]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < n_out - 1:
+            next_lo, next_hi = edges[i + 1], edges[i + 2]
+            mean_x, mean_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        else:
+            mean_x, mean_y = x[-1], y[-1]
+        area = np.abs((x[a] - mean_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected, y[selected]
+
+
+class MinMaxPyramid:
+    """
+    Multi-resolution min/max summary of a signal: level l keeps the minimum and maximum (and their indexes) of every
+    factor**l samples. Decimating any range then reads at most a few times n_bins values from the coarsest level
+    fine enough, instead of the whole range of the signal.
+    """
+
+    def __init__(self, x, factor=4, min_length=256):
+        """
+        Constructor.
+
+        :param numpy.array x: signal, 1-D
+        :param int factor: number of bins of a level merged into one bin of the next level
+        :param int min_length: the coarsest level has at least this number of bins
+        """
+        self.x = np.asarray(x)
+        self.factor = factor
+        indices = np.arange(len(self.x))
+        self.levels = [(indices, self.x, indices, self.x)]
+        while len(self.levels[-1][1]) >= factor * min_length:
+            imin, vmin, imax, vmax = self.levels[-1]
+            n = len(vmin) // factor * factor
+            rows = np.arange(n // factor)
+            argmin = np.argmin(vmin[:n].reshape(-1, factor), axis=1)
+            argmax = np.argmax(vmax[:n].reshape(-1, factor), axis=1)
+            self.levels.append((imin[:n].reshape(-1, factor)[rows, argmin], vmin[:n].reshape(-1, factor)[rows, argmin],
+                                imax[:n].reshape(-1, factor)[rows, argmax], vmax[:n].reshape(-1, factor)[rows, argmax]))
+        return
+
+    def __len__(self):
+        return len(self.x)
+
+    def decimate(self, start, stop, n_bins):
+        """
+        Min/max decimation of a range, see minmax_decimate. The bins of the pyramid level used are aligned on
+        multiples of its bin size, so the range boundaries are rounded to them.
+
+        :param int start: index of the first sample of the range
+        :param int stop: index after the last sample of the range
+        :param int n_bins: number of bins
+        :return: indexes of the kept samples, their values (at most 2 * n_bins of each)
+        :rtype: numpy.array, numpy.array
+        """
+        start = max(int(start), 0)
+        stop = min(int(stop), len(self.x))
+        if stop - start <= 2 * n_bins:
+            return np.arange(start, stop), self.x[start:stop]
+        level = 0
+        while level + 1 < len(self.levels) and self.factor ** (level + 1) * n_bins <= stop - start:
+            level += 1
+        size = self.factor ** level
+        first = start // size
+        last = min(-(-stop // size), len(self.levels[level][1]))
+        if level:
+            # samples after the last complete bin of the level
+            tail_start = len(self.levels[level][1]) * size
+            tail = np.arange(max(tail_start, start), stop)
+        else:
+            tail = np.arange(0)
+        imin, vmin, imax, vmax = [a[first:last] for a in self.levels[level]]
+        if len(tail):
+            imin, imax = np.concatenate((imin, tail)), np.concatenate((imax, tail))
+            vmin, vmax = np.concatenate((vmin, self.x[tail])), np.concatenate((vmax, self.x[tail]))
+        return _minmax_bins(imin, vmin, imax, vmax, n_bins)
+
+
+class DecimatedPlot:
+    """
+    Lines of a matplotlib axes showing long signals at screen resolution: each line holds the min/max decimation of
+    the visible range, recomputed from the signal's pyramid whenever the x limits change (zoom, pan)
+    """
+
+    def __init__(self, ax, data, sampling_rate=1.0, t0=0.0, n_bins=None, method='minmax', labels=None, **kwargs):
+        """
+        Constructor, plot the signals.
+
+        :param matplotlib.axes.Axes ax: axes
+        :param numpy.array data: signals, shape (n_samples,) or (n_samples, n_channels), one line per channel
+        :param float sampling_rate: sampling rate (Hz), the x axis is the time in seconds
+        :param float t0: time of the first sample (s)
+        :param int n_bins: number of bins of the visible range, defaults to the width of the axes in pixels
+        :param str method: 'minmax', or 'lttb' for a LTTB reduction of a finer min/max decimation
+        :param list labels: one label per channel
+        :param kwargs: other arguments of ax.plot
+        :raise ValueError: If the method is unknown
+        """
+        if method not in ('minmax', 'lttb'):
+            raise ValueError('Unknown decimation method: ' + str(method))
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        self.ax = ax
+        self.sampling_rate = sampling_rate
+        self.t0 = t0
+        self.n_bins = n_bins
+        self.method = method
+        self.pyramids = [MinMaxPyramid(data[:, i]) for i in range(data.shape[1])]
+        if labels is None:
+            labels = [kwargs.pop('label', None)] + [None] * (data.shape[1] - 1)
+        self.lines = []
+        for label in labels:
+            self.lines.extend(ax.plot([], [], label=label, **kwargs))
+        self._range = None
+        self._callbacks = [(axes, axes.callbacks.connect('xlim_changed', self.refresh))
+                           for axes in ax.get_shared_x_axes().get_siblings(ax)]
+        self.refresh()
+        ax.set_xlim(self.t0, self.t0 + (len(data) - 1) / sampling_rate)
+        return
+
+    def _bins(self):
+        if self.n_bins is not None:
+            return self.n_bins
+        return max(int(self.ax.bbox.width), 100)
+
+    def refresh(self, ax=None):
+        """
+        Decimate the visible range again, called when the x limits change.
+
+        :param matplotlib.axes.Axes ax: axes whose limits changed, unused
+        """
+        n = len(self.pyramids[0])
+        lower, upper = self.ax.get_xlim() if self._range is not None else (self.t0, self.t0 + n / self.sampling_rate)
+        start = max(int(np.floor((lower - self.t0) * self.sampling_rate)) - 1, 0)
+        stop = min(int(np.ceil((upper - self.t0) * self.sampling_rate)) + 2, n)
+        n_bins = self._bins()
+        if (start, stop, n_bins) == self._range:
+            return
+        self._range = (start, stop, n_bins)
+        for line, pyramid in zip(self.lines, self.pyramids):
+            if self.method == 'lttb':
+                indices, values = pyramid.decimate(start, stop, 4 * n_bins)
+                selected, values = lttb(values, 2 * n_bins, x=indices)
+                indices = indices[selected]
+            else:
+                indices, values = pyramid.decimate(start, stop, n_bins)
+            line.set_data(self.t0 + indices / self.sampling_rate, values)
+        return
+
+    def disconnect(self):
+        """
+        Stop following the x limits of the axes.
+        """
+        for axes, cid in self._callbacks:
+            axes.callbacks.disconnect(cid)
+        self._callbacks = []
+        return
+
+
+def plot_decimated(ax, data, sampling_rate=1.0, **kwargs):
+    """
+    Plot long signals decimated to screen resolution, see DecimatedPlot.
+
+    :param matplotlib.axes.Axes ax: axes
+    :param numpy.array data: signals, shape (n_samples,) or (n_samples, n_channels)
+    :param float sampling_rate: sampling rate (Hz)
+    :param kwargs: other arguments of DecimatedPlot and ax.plot
+    :return: decimated plot, keep it alive as long as the axes are zoomed
+    :rtype: DecimatedPlot
+    """
+    return DecimatedPlot(ax, data, sampling_rate=sampling_rate, **kwargs)